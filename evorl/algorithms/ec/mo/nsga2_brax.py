@@ -1,4 +1,5 @@
 import logging
+from functools import cached_property
 import numpy as np
 from omegaconf import DictConfig
 from typing_extensions import Self  # pytype: disable=not-supported-yet]
@@ -11,12 +12,14 @@ from evox.algorithms import NSGA2
 from evox.operators import non_dominated_sort
 
 from evorl.types import State, Params
+from evorl.metrics import MetricBase
 from evorl.envs import AutoresetMode, create_env
 from evorl.evaluators import BraxEvaluator
 from evorl.agent import AgentState
 from evorl.distributed import unpmap
 from evorl.ec.optimizers import EvoXAlgorithmAdapter, ECState
-from evorl.utils.ec_utils import ParamVectorSpec
+from evorl.utils.ec_utils import ParamVectorSpec, rank_intersect
+from evorl.utils.jax_utils import tree_get
 from evorl.recorders import get_1d_array_statistics
 from evorl.workflows import MultiObjectiveECWorkflowTemplate
 
@@ -141,48 +144,100 @@ class NSGA2Workflow(MultiObjectiveECWorkflowTemplate):
             params=agent_state.params.replace(policy_params=params)
         )
 
+    @cached_property
+    def _cpu_device(self):
+        return jax.devices("cpu")[0]
+
+    @cached_property
+    def _cpu_non_dominated_sort(self):
+        # traced once, and compiled for the CPU device of its committed inputs.
+        # The objectives are maximized, negate them inside the compiled sort.
+        return jax.jit(lambda objectives: non_dominated_sort(-objectives, "scan"))
+
+    def _record_step_metrics(
+        self, train_metrics: MetricBase, workflow_metrics: MetricBase, iters: int
+    ) -> None:
+        self.recorder.write(workflow_metrics.to_local_dict(), iters)
+
+        # extract the pareto front from the host copy of the objectives
+        objectives = np.asarray(train_metrics.objectives)
+        if self.config.pf_sort_method == "scan":
+            pf_rank = self._cpu_non_dominated_sort(
+                jax.device_put(objectives, self._cpu_device)
+            )
+        else:
+            pf_rank = rank_intersect(-objectives)
+        pf_objectives = objectives[np.asarray(pf_rank) == 0]
+
+        train_metrics_dict = {}
+        metric_names = self.config.metric_names
+        train_metrics_dict["objectives"] = {
+            metric_names[i]: get_1d_array_statistics(objectives[:, i], histogram=True)
+            for i in range(len(metric_names))
+        }
+
+        train_metrics_dict["pf_objectives"] = {
+            metric_names[i]: get_1d_array_statistics(
+                pf_objectives[:, i], histogram=True
+            )
+            for i in range(len(metric_names))
+        }
+        train_metrics_dict["num_pf"] = pf_objectives.shape[0]
+
+        self.recorder.write(train_metrics_dict, iters)
+
     def learn(self, state: State) -> State:
-        start_iteration = unpmap(state.metrics.iterations, self.pmap_axis_name)
-
-        for i in range(start_iteration, self.config.num_iters):
-            iters = i + 1
-            train_metrics, state = self.step(state)
-            workflow_metrics = state.metrics
-
-            train_metrics = unpmap(train_metrics, self.pmap_axis_name)
-            workflow_metrics = unpmap(workflow_metrics, self.pmap_axis_name)
-            self.recorder.write(workflow_metrics.to_local_dict(), iters)
-
-            cpu_device = jax.devices("cpu")[0]
-            with jax.default_device(cpu_device):
-                objectives = jax.device_put(train_metrics.objectives, cpu_device)
-                pf_rank = non_dominated_sort(-objectives, "scan")
-                pf_objectives = train_metrics.objectives[pf_rank == 0]
-
-            train_metrics_dict = {}
-            metric_names = self.config.metric_names
-            objectives = np.asarray(objectives)
-            pf_objectives = np.asarray(pf_objectives)
-            train_metrics_dict["objectives"] = {
-                metric_names[i]: get_1d_array_statistics(
-                    objectives[:, i], histogram=True
-                )
-                for i in range(len(metric_names))
-            }
+        num_iters = self.config.num_iters
+        save_interval = self.config.checkpoint.save_interval_steps
+        # the scanned multi-step is not pmapped, use step() in multi-devices mode
+        num_jitted_iters = (
+            1 if self.enable_multi_devices else self.config.num_jitted_iters
+        )
+
+        i = int(unpmap(state.metrics.iterations, self.pmap_axis_name))
+        while i < num_iters:
+            # run up to `num_jitted_iters` iterations per host sync, and stop
+            # early at the next checkpoint boundary.
+            num_steps = min(
+                num_jitted_iters, num_iters - i, save_interval - i % save_interval
+            )
 
-            train_metrics_dict["pf_objectives"] = {
-                metric_names[i]: get_1d_array_statistics(
-                    pf_objectives[:, i], histogram=True
+            if self.enable_multi_devices:
+                train_metrics, state = self.step(state)
+                step_metrics = [
+                    jax.device_get(
+                        unpmap((train_metrics, state.metrics), self.pmap_axis_name)
+                    )
+                ]
+            else:
+                train_metrics, workflow_metrics, state = self._multi_steps(
+                    state, num_steps
+                )
+                # transfer the stacked metrics to host once per `num_steps` iters
+                train_metrics, workflow_metrics = jax.device_get(
+                    (train_metrics, workflow_metrics)
+                )
+                step_metrics = [
+                    (tree_get(train_metrics, j), tree_get(workflow_metrics, j))
+                    for j in range(num_steps)
+                ]
+
+            for j, (train_metrics, workflow_metrics) in enumerate(step_metrics):
+                self._record_step_metrics(train_metrics, workflow_metrics, i + j + 1)
+
+            i += num_steps
+            iters = i
+
+            # only unpmap the state at the steps that are actually saved; the save
+            # is async, so serialization overlaps with the next steps.
+            if self.checkpoint_manager.should_save(iters):
+                self.checkpoint_manager.save(
+                    iters,
+                    args=ocp.args.StandardSave(
+                        unpmap(state, self.pmap_axis_name),
+                    ),
                 )
-                for i in range(len(metric_names))
-            }
-            train_metrics_dict["num_pf"] = pf_objectives.shape[0]
 
-            self.recorder.write(train_metrics_dict, iters)
+        self.checkpoint_manager.wait_until_finished()
 
-            self.checkpoint_manager.save(
-                iters,
-                args=ocp.args.StandardSave(
-                    unpmap(state, self.pmap_axis_name),
-                ),
-            )
+        return state
@@ -60,6 +60,7 @@ class OpenESWorkflow(ESWorkflowTemplate):
             mirror_sampling=config.mirror_sampling,
             weight_decay=config.weight_decay,
             optimizer_name=config.optimizer_name,
+            noise_dtype=config.noise_dtype,
         )
 
         if config.explore:
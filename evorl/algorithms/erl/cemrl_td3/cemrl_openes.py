@@ -44,6 +44,11 @@ class CEMRLOpenESWorkflow(CEMRLTD3WorkflowTemplate):
         assert config.warmup_iters > 0 or config.random_timesteps > 0, (
             "Either warmup_iters or random_timesteps should be positive to pre-fill some data in the replay buffer"
         )
+        # RL injection overwrites the noise of single individuals, while the mirrored
+        # OpenES only stores the first half of the noise.
+        assert not config.mirror_sampling, (
+            "mirror_sampling is not supported with RL injection"
+        )
 
         # env for one actor
         env = create_env(
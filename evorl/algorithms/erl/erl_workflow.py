@@ -9,6 +9,7 @@ import jax.numpy as jnp
 import optax
 
 from evorl.agent import AgentStateAxis
+from evorl.distributed import local_devices
 from evorl.metrics import MetricBase, metric_field
 from evorl.types import PyTreeDict, State
 from evorl.utils import running_statistics
@@ -71,7 +72,7 @@ class ERLWorkflowBase(Workflow):
         self.evaluator = evaluator
         self.replay_buffer = replay_buffer
 
-        self.devices = jax.local_devices()[:1]
+        self.devices = list(local_devices()[:1])
 
     @classmethod
     def build_from_config(
@@ -82,7 +83,7 @@ class ERLWorkflowBase(Workflow):
     ) -> Self:
         config = copy.deepcopy(config)  # avoid in-place modification
 
-        devices = jax.local_devices()
+        devices = list(local_devices())
 
         if enable_multi_devices or len(devices) > 1:
             raise NotImplementedError("Multi-devices is not supported yet.")
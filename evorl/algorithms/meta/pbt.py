@@ -5,7 +5,6 @@ import optax
 from optax.schedules import InjectStatefulHyperparamsState
 
 from evorl.types import PyTreeDict, State
-from evorl.utils.jax_utils import tree_deepcopy
 
 from .pbt_workflow import PBTWorkflowTemplate, PBTOptState
 from .pbt_utils import log_uniform_init
@@ -40,7 +39,9 @@ class PBTWorkflow(PBTWorkflowTemplate):
     ) -> State:
         opt_state = workflow_state.opt_state
         assert isinstance(opt_state, InjectStatefulHyperparamsState)
-        # InjectStatefulHyperparamsState is NamedTuple, which is not immutable.
-        opt_state = tree_deepcopy(opt_state)
-        opt_state.hyperparams["learning_rate"] = hyperparams.lr
+        # InjectStatefulHyperparamsState.hyperparams is a mutable dict,
+        # so we build a new one instead of modifying it in-place.
+        opt_state = opt_state._replace(
+            hyperparams={**opt_state.hyperparams, "learning_rate": hyperparams.lr}
+        )
         return workflow_state.replace(opt_state=opt_state)
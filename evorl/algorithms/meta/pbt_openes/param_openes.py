@@ -67,7 +67,14 @@ class OpenES(EvoOptimizer):
                 state.mean,
                 sample_keys,
             )
-            noise = jtu.tree_map(lambda z: jnp.concatenate([z, -z], axis=0), noise)
+            # only store the first half noise, the second half is its negation
+            pop = jtu.tree_map(
+                lambda m, z: jnp.concatenate(
+                    [m + state.noise_std * z, m - state.noise_std * z], axis=0
+                ),
+                state.mean,
+                noise,
+            )
         else:
             noise = jtu.tree_map(
                 lambda x, k: jax.random.normal(k, shape=(self.pop_size, *x.shape)),
@@ -75,11 +82,11 @@ class OpenES(EvoOptimizer):
                 sample_keys,
             )
 
-        pop = jtu.tree_map(
-            lambda m, z: m + state.noise_std * z,
-            state.mean,
-            noise,
-        )
+            pop = jtu.tree_map(
+                lambda m, z: m + state.noise_std * z,
+                state.mean,
+                noise,
+            )
         state = state.replace(key=key, noise=noise)
 
         return pop, state
@@ -88,6 +95,13 @@ class OpenES(EvoOptimizer):
         self, state: ECState, fitnesses: chex.Array
     ) -> tuple[PyTreeDict, OpenESState]:
         transformed_fitnesses = self.fitness_shaping_fn(fitnesses)
+        if self.mirror_sampling:
+            # noise only has the first half z, the mirrored half -z contributes
+            # with the negative weights.
+            half = self.pop_size // 2
+            transformed_fitnesses = (
+                transformed_fitnesses[:half] - transformed_fitnesses[half:]
+            )
 
         # grad = 1/(N*sigma^2) * sum(F_i*(x_i-m))
         grad = jtu.tree_map(
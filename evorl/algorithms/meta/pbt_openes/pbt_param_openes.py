@@ -3,7 +3,6 @@ import jax
 
 from evorl.types import PyTreeDict, State
 from evorl.metrics import EvaluateMetric
-from evorl.utils.jax_utils import tree_deepcopy
 from evorl.distributed import shmap_vmap
 
 from ..pbt_workflow import PBTWorkflowTemplate, PBTOptState, PBTEvalMetric
@@ -42,8 +41,12 @@ class PBTParamOpenESWorkflow(PBTWorkflowTemplate):
         ec_opt_state = workflow_state.ec_opt_state
 
         optax_opt_state = ec_opt_state.opt_state
-        optax_opt_state = tree_deepcopy(optax_opt_state)
-        optax_opt_state.hyperparams["learning_rate"] = hyperparams.ec_lr
+        optax_opt_state = optax_opt_state._replace(
+            hyperparams={
+                **optax_opt_state.hyperparams,
+                "learning_rate": hyperparams.ec_lr,
+            }
+        )
 
         ec_opt_state = ec_opt_state.replace(
             opt_state=optax_opt_state,
@@ -75,6 +78,7 @@ class PBTParamOpenESWorkflow(PBTWorkflowTemplate):
             mesh=self.sharding.mesh,
             in_specs=self.sharding.spec,
             out_specs=self.sharding.spec,
+            batch_size=self.config.pop_chunk_size,
             check_rep=False,
         )
 
@@ -16,16 +16,13 @@ def explore(
     i.e., mutation op in the context of EC.
     Here we use the orginal exploration operator in PBT.
     """
+    hp_names = list(parent.keys())
+    # draw the perturbations of all hyperparameters at once
+    noise = jax.random.uniform(key, (len(hp_names),), minval=-1.0, maxval=1.0)
+
     offspring = PyTreeDict()
-    for hp_name in parent.keys():
-        val = parent[hp_name] * (
-            1
-            + jax.random.uniform(
-                key,
-                minval=-perturb_factor[hp_name],
-                maxval=perturb_factor[hp_name],
-            )
-        )
+    for i, hp_name in enumerate(hp_names):
+        val = parent[hp_name] * (1 + perturb_factor[hp_name] * noise[i])
         offspring[hp_name] = jnp.clip(
             val, min=search_space[hp_name]["low"], max=search_space[hp_name]["high"]
         )
@@ -37,9 +34,9 @@ def select(
     pop_episode_returns: chex.Array, key: chex.PRNGKey, bottoms_num: int, tops_num: int
 ):
     """Select parents to replace worse individuals."""
-    indices = jnp.argsort(pop_episode_returns)
-    bottoms_indices = indices[:bottoms_num]
-    tops_indices = indices[-tops_num:]
+    # only the extremes are needed, so avoid a full sort
+    _, tops_indices = jax.lax.top_k(pop_episode_returns, tops_num)
+    _, bottoms_indices = jax.lax.top_k(-pop_episode_returns, bottoms_num)
 
     # replace bottoms with random tops
     tops_choice_indices = jax.random.choice(
@@ -1,11 +1,9 @@
 import logging
-from functools import partial
 from omegaconf import DictConfig
 
 import chex
 import jax
 import jax.numpy as jnp
-import jax.tree_util as jtu
 import optax
 
 from evorl.agent import AgentState
@@ -19,7 +17,13 @@ from evorl.rollout import rollout
 from evorl.sample_batch import SampleBatch
 from evorl.types import PyTreeDict, State, LossDict
 from evorl.utils import running_statistics
-from evorl.utils.jax_utils import tree_stop_gradient, scan_and_mean
+from evorl.utils.jax_utils import (
+    tree_stop_gradient,
+    scan_and_mean,
+    tree_pack,
+    tree_unpack,
+    rng_split_by_shape,
+)
 from evorl.utils.rl_toolkits import (
     average_episode_discount_return,
     compute_gae,
@@ -49,8 +53,8 @@ class ParamPPOAgent(PPOAgent):
         if self.normalize_obs:
             obs = self.obs_preprocessor(obs, agent_state.obs_preprocessor_state)
 
-        # mask invalid transitions at autoreset
-        mask = jnp.logical_not(sample_batch.extras.env_extras.autoreset)
+        # mask invalid transitions at autoreset, precomputed in the workflow
+        mask = sample_batch.extras.mask
 
         # ======= critic =======
         vs = self.value_network.apply(agent_state.params.value_params, obs)
@@ -247,9 +251,15 @@ class ParamPPOWorkflow(PPOWorkflow):
         )
 
         # ======== compute GAE =======
-        _obs = jnp.concatenate([trajectory.obs, trajectory.next_obs[-1:]], axis=0)
-        # concat [values, bootstrap_value]
-        vs = self.agent.compute_values(state.agent_state, SampleBatch(obs=_obs))
+        # concat [values, bootstrap_value] instead of [obs, bootstrap_obs],
+        # which avoids materializing a [T+1, B, ...] copy of the observations
+        vs = self.agent.compute_values(
+            state.agent_state, SampleBatch(obs=trajectory.obs)
+        )
+        bootstrap_vs = self.agent.compute_values(
+            state.agent_state, SampleBatch(obs=trajectory.next_obs[-1:])
+        )
+        vs = jnp.concatenate([vs, bootstrap_vs], axis=0)
 
         gae_lambda = 1 - jnp.exp(-state.hp_state.gae_lambda_g)
         discount = 1 - jnp.exp(-state.hp_state.discount_g)
@@ -265,6 +275,13 @@ class ParamPPOWorkflow(PPOWorkflow):
         trajectory.extras.advantages = jax.lax.stop_gradient(advantages)
         # [T,B,...] -> [T*B,...]
         trajectory = tree_stop_gradient(flatten_rollout_trajectory(trajectory))
+        # mask invalid transitions at autoreset
+        trajectory.extras.mask = jnp.logical_not(
+            trajectory.extras.env_extras.autoreset
+        )
+        # pack the leaves once into one [T*B, D] buffer per dtype, so each epoch
+        # gathers its minibatches with one kernel per dtype
+        packed_trajectory, trajectory_layout = tree_pack(trajectory, batch_ndim=1)
         # ============================
 
         def loss_fn(agent_state, sample_batch, key):
@@ -291,40 +308,48 @@ class ParamPPOWorkflow(PPOWorkflow):
             // self.config.minibatch_size
         )
 
-        def _get_shuffled_minibatch(perm_key, x):
-            x = x[jax.random.permutation(perm_key, x.shape[0])][
-                : num_minibatches * self.config.minibatch_size
-            ]
-            return x.reshape(num_minibatches, self.config.minibatch_size, *x.shape[1:])
-
-        def minibatch_step(carry, trajectory):
-            opt_state, agent_state, key = carry
-            key, learn_key = jax.random.split(key)
+        def minibatch_step(carry, xs):
+            opt_state, agent_state = carry
+            packed_minibatch, learn_key = xs
+            minibatch = tree_unpack(packed_minibatch, trajectory_layout)
 
             (loss, loss_dict), agent_state, opt_state = update_fn(
-                opt_state, agent_state, trajectory, learn_key
+                opt_state, agent_state, minibatch, learn_key
             )
 
-            return (opt_state, agent_state, key), (loss, loss_dict)
+            return (opt_state, agent_state), (loss, loss_dict)
+
+        def epoch_step(carry, keys):
+            opt_state, agent_state = carry
+            perm_key, learn_keys = keys[0], keys[1:]
 
-        def epoch_step(carry, _):
-            opt_state, agent_state, key = carry
-            perm_key, learn_key = jax.random.split(key, num=2)
+            # share one permutation across all leaves of the trajectory
+            perm = jax.random.permutation(
+                perm_key, self.config.rollout_length * self.config.num_envs
+            )[: num_minibatches * self.config.minibatch_size].reshape(
+                num_minibatches, self.config.minibatch_size
+            )
 
-            (opt_state, agent_state, key), (loss, loss_dict) = scan_and_mean(
+            (opt_state, agent_state), (loss, loss_dict) = scan_and_mean(
                 minibatch_step,
-                (opt_state, agent_state, learn_key),
-                jtu.tree_map(partial(_get_shuffled_minibatch, perm_key), trajectory),
+                (opt_state, agent_state),
+                (tuple(x[perm] for x in packed_trajectory), learn_keys),
                 length=num_minibatches,
             )
 
-            return (opt_state, agent_state, key), (loss, loss_dict)
+            return (opt_state, agent_state), (loss, loss_dict)
+
+        # split all keys up-front instead of carrying a key through the scans:
+        # [reuse_rollout_epochs, 1 + num_minibatches, 2]
+        epoch_keys = rng_split_by_shape(
+            learn_key, (self.config.reuse_rollout_epochs, 1 + num_minibatches)
+        )
 
         # loss_list: [reuse_rollout_epochs, num_minibatches]
-        (opt_state, agent_state, _), (loss, loss_dict) = scan_and_mean(
+        (opt_state, agent_state), (loss, loss_dict) = scan_and_mean(
             epoch_step,
-            (state.opt_state, agent_state, learn_key),
-            None,
+            (state.opt_state, agent_state),
+            epoch_keys,
             length=self.config.reuse_rollout_epochs,
         )
 
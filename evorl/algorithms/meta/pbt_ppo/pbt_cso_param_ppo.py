@@ -119,13 +119,6 @@ class PBTCSOParamPPOWorkflow(PBTParamPPOWorkflow):
             students_velocity[hp] = v_stu
             offsprings[hp] = x_stu
 
-        # Note: no need to deepcopy teachers_wf_state here, since it should be
-        # ensured immutable in apply_hyperparams_to_workflow_state()
-        teachers_wf_state = tree_get(pop_workflow_state, teacher_indices)
-        offsprings_workflow_state = jax.vmap(self.apply_hyperparams_to_workflow_state)(
-            teachers_wf_state, offsprings
-        )
-
         velocity = tree_set(
             velocity, students_velocity, student_indices, unique_indices=True
         )
@@ -133,11 +126,13 @@ class PBTCSOParamPPOWorkflow(PBTParamPPOWorkflow):
 
         # ==== survival | merge population ====
         pop = tree_set(pop, offsprings, student_indices, unique_indices=True)
-        pop_workflow_state = tree_set(
-            pop_workflow_state,
-            offsprings_workflow_state,
-            student_indices,
-            unique_indices=True,
+        # copy teachers' wf_state to students with a single gather.
+        # Note: no need to deepcopy teachers' wf_state here, since it should be
+        # ensured immutable in apply_hyperparams_to_workflow_state()
+        src_indices = jnp.arange(pop_size).at[student_indices].set(teacher_indices)
+        pop_workflow_state = tree_get(pop_workflow_state, src_indices)
+        pop_workflow_state = self.apply_hyperparams_to_pop_workflow_state(
+            pop_workflow_state, pop
         )
 
         return pop, pop_workflow_state, pbt_opt_state
@@ -1,6 +1,7 @@
 import copy
 import logging
 import math
+from collections.abc import Callable
 from functools import partial
 from omegaconf import DictConfig, OmegaConf, open_dict, read_write
 
@@ -17,8 +18,8 @@ import orbax.checkpoint as ocp
 from evorl.agent import RandomAgent
 from evorl.distributed import (
     POP_AXIS_NAME,
+    local_devices,
     shmap_vmap,
-    tree_device_put,
 )
 from evorl.rollout import rollout
 from evorl.metrics import MetricBase, EvaluateMetric
@@ -30,10 +31,11 @@ from evorl.recorders import get_1d_array_statistics, get_1d_array, add_prefix
 from evorl.utils.rl_toolkits import flatten_rollout_trajectory
 from evorl.utils.jax_utils import (
     tree_get,
-    tree_set,
     tree_stop_gradient,
+    tree_zeros_like,
     scan_and_last,
     is_jitted,
+    enable_compilation_cache,
 )
 from evorl.utils import running_statistics
 from evorl.workflows import RLWorkflow, OffPolicyWorkflow, Workflow
@@ -77,7 +79,7 @@ class PBTWorkflowBase(Workflow):
 
         self.workflow = workflow
         self.evaluator = evaluator
-        self.devices = jax.local_devices()[:1]
+        self.devices = list(local_devices()[:1])
         self.sharding = None  # training sharding
 
     @classmethod
@@ -98,7 +100,10 @@ class PBTWorkflowBase(Workflow):
     ):
         config = copy.deepcopy(config)  # avoid in-place modification
 
-        devices = jax.local_devices()
+        # PBT compiles a large population-level graph, reuse it across runs
+        enable_compilation_cache()
+
+        devices = list(local_devices())
 
         OmegaConf.set_readonly(config, False)
         cls._rescale_config(config)
@@ -109,6 +114,8 @@ class PBTWorkflowBase(Workflow):
         OmegaConf.set_readonly(config, True)
 
         workflow = cls._build_from_config(config)
+        # fix the target workflow's optimizer before any jit tracing
+        workflow._customize_optimizer()
 
         mesh = Mesh(devices, axis_names=(POP_AXIS_NAME,))
         workflow.devices = devices
@@ -122,7 +129,7 @@ class PBTWorkflowBase(Workflow):
         target_workflow_config = copy.deepcopy(target_workflow_config)
         target_workflow_cls = hydra.utils.get_class(target_workflow_config.workflow_cls)
 
-        devices = jax.local_devices()
+        devices = list(local_devices())
 
         with read_write(target_workflow_config):
             with open_dict(target_workflow_config):
@@ -158,26 +165,44 @@ class PBTWorkflowBase(Workflow):
     ) -> tuple[chex.ArrayTree, PBTOptState]:
         raise NotImplementedError
 
+    def _pop_vmap(self, fn: Callable) -> Callable:
+        """Vectorize fn over the local population.
+
+        When `config.pop_chunk_size` is set, the population is processed in chunks
+        of that size to cap the peak memory.
+        """
+        chunk_size = self.config.pop_chunk_size
+        if chunk_size is None:
+            return jax.vmap(fn)
+
+        return lambda *args: jax.lax.map(lambda x: fn(*x), args, batch_size=chunk_size)
+
     def _customize_optimizer(self) -> None:
+        """Customize the target workflow's optimizer.
+
+        Called once in build_from_config(), before any jitted method is traced.
+        """
         pass
 
     def setup(self, key: chex.PRNGKey):
         pop_size = self.config.pop_size
-        self._customize_optimizer()
 
         key, workflow_key, pop_key = jax.random.split(key, num=3)
 
-        pop, pbt_opt_state = self._setup_pop_and_pbt_optimizer(pop_key)
-        pop = tree_device_put(pop, self.sharding)
+        shared_sharding = NamedSharding(self.sharding.mesh, P())
+
+        # generate the pop and workflow keys directly on their target shardings
+        pop, pbt_opt_state = jax.jit(
+            self._setup_pop_and_pbt_optimizer,
+            out_shardings=(self.sharding, shared_sharding),
+        )(pop_key)
 
         workflow_metrics = PBTWorkflowMetric()
-        shared_sharding = NamedSharding(self.sharding.mesh, P())
-        key, workflow_metrics, pbt_opt_state = jax.device_put(
-            (key, workflow_metrics, pbt_opt_state), shared_sharding
-        )
+        key, workflow_metrics = jax.device_put((key, workflow_metrics), shared_sharding)
 
-        workflow_keys = jax.random.split(workflow_key, pop_size)
-        workflow_keys = jax.device_put(workflow_keys, self.sharding)
+        workflow_keys = jax.jit(
+            partial(jax.random.split, num=pop_size), out_shardings=self.sharding
+        )(workflow_key)
         pop_workflow_state = shmap_vmap(
             self.workflow.setup,
             mesh=self.sharding.mesh,
@@ -191,13 +216,9 @@ class PBTWorkflowBase(Workflow):
         # so we don't need sync them here.
         # Caution: for off-policy workflow with postsetup, this may not be true.
 
-        pop_workflow_state = shmap_vmap(
-            self.apply_hyperparams_to_workflow_state,
-            mesh=self.sharding.mesh,
-            in_specs=self.sharding.spec,
-            out_specs=self.sharding.spec,
-            check_rep=False,
-        )(pop_workflow_state, pop)
+        pop_workflow_state = self.apply_hyperparams_to_pop_workflow_state(
+            pop_workflow_state, pop
+        )
 
         return State(
             key=key,  # shared
@@ -215,7 +236,9 @@ class PBTWorkflowBase(Workflow):
         # ===== step ======
         def _train_steps(pop_wf_state):
             def _one_step(pop_wf_state, _):
-                train_metrics, pop_wf_state = jax.vmap(self.workflow.step)(pop_wf_state)
+                train_metrics, pop_wf_state = self._pop_vmap(self.workflow.step)(
+                    pop_wf_state
+                )
                 return pop_wf_state, train_metrics
 
             pop_wf_state, train_metrics = scan_and_last(
@@ -235,32 +258,18 @@ class PBTWorkflowBase(Workflow):
         pop_train_metrics, pop_workflow_state = train_steps_fn(pop_workflow_state)
 
         # ===== eval ======
-        eval_fn = shmap_vmap(
-            self.workflow.evaluate,
-            mesh=self.sharding.mesh,
-            in_specs=self.sharding.spec,
-            out_specs=self.sharding.spec,
-            check_rep=False,
+        pop_eval_metrics, pop_workflow_state = self._evaluate_pop_workflow_state(
+            state.metrics.iterations, pop_workflow_state
         )
 
-        pop_eval_metrics, pop_workflow_state = eval_fn(pop_workflow_state)
-
         # customize your pop metrics here
         pop_episode_returns = pop_eval_metrics.episode_returns
 
         # ===== warmup or exploit & explore ======
         key, exploit_and_explore_key = jax.random.split(state.key)
 
-        def _dummy_fn(pbt_opt_state, pop, pop_workflow_state, pop_metrics, key):
-            return pop, pop_workflow_state, pbt_opt_state
-
-        pop, pop_workflow_state, pbt_opt_state = jax.lax.cond(
-            state.metrics.iterations + 1
-            <= math.ceil(
-                self.config.warmup_steps / self.config.workflow_steps_per_iter
-            ),
-            _dummy_fn,
-            self.exploit_and_explore,
+        pop, pop_workflow_state, pbt_opt_state = self._masked_exploit_and_explore(
+            state.metrics.iterations,
             pbt_opt_state,
             pop,
             pop_workflow_state,
@@ -301,6 +310,30 @@ class PBTWorkflowBase(Workflow):
             pbt_opt_state=pbt_opt_state,
         )
 
+    def _multi_steps(
+        self, state: State, num_steps: int
+    ) -> tuple[MetricBase, MetricBase, State]:
+        """Run multiple PBT iterations inside a single `jax.lax.scan`.
+
+        Args:
+            state: State of the workflow.
+            num_steps: Number of iterations to run. Should be static under jit.
+
+        Returns:
+            Tuple of (train_metrics, workflow_metrics, state), where the metrics
+            are stacked along the first axis with length `num_steps`.
+        """
+
+        def _one_step(state, _):
+            train_metrics, state = self.step(state)
+            return state, (train_metrics, state.metrics)
+
+        state, (train_metrics, workflow_metrics) = jax.lax.scan(
+            _one_step, state, (), length=num_steps
+        )
+
+        return train_metrics, workflow_metrics, state
+
     def evaluate(self, state: State) -> State:
         key, eval_key = jax.random.split(state.key, num=2)
 
@@ -321,6 +354,7 @@ class PBTWorkflowBase(Workflow):
             mesh=self.sharding.mesh,
             in_specs=self.sharding.spec,
             out_specs=self.sharding.spec,
+            batch_size=self.config.pop_chunk_size,
             check_rep=False,
         )
 
@@ -345,16 +379,96 @@ class PBTWorkflowBase(Workflow):
     ) -> tuple[chex.ArrayTree, State, PBTOptState]:
         raise NotImplementedError
 
+    @property
+    def warmup_iters(self) -> int:
+        """Number of PBT iterations before exploit_and_explore() takes effect."""
+        return math.ceil(self.config.warmup_steps / self.config.workflow_steps_per_iter)
+
+    def _evaluate_pop_workflow_state(
+        self, iterations: chex.Array, pop_workflow_state: State
+    ) -> tuple[MetricBase, State]:
+        """Evaluate the target workflows of the population.
+
+        When `config.skip_warmup_eval` is set, the evaluation is skipped during
+        warmup and zero metrics are returned instead, since the results would be
+        discarded by _masked_exploit_and_explore() anyway.
+        """
+        eval_fn = shmap_vmap(
+            self.workflow.evaluate,
+            mesh=self.sharding.mesh,
+            in_specs=self.sharding.spec,
+            out_specs=self.sharding.spec,
+            batch_size=self.config.pop_chunk_size,
+            check_rep=False,
+        )
+
+        if not self.config.skip_warmup_eval:
+            return eval_fn(pop_workflow_state)
+
+        def _skip_eval(pop_workflow_state):
+            pop_eval_metrics, _ = jax.eval_shape(eval_fn, pop_workflow_state)
+            return tree_zeros_like(pop_eval_metrics), pop_workflow_state
+
+        return jax.lax.cond(
+            iterations + 1 <= self.warmup_iters,
+            _skip_eval,
+            eval_fn,
+            pop_workflow_state,
+        )
+
+    def _masked_exploit_and_explore(
+        self,
+        iterations: chex.Array,
+        pbt_opt_state: PBTOptState,
+        pop: chex.ArrayTree,
+        pop_workflow_state: State,
+        pop_metrics: chex.ArrayTree,
+        key: chex.PRNGKey,
+    ) -> tuple[chex.ArrayTree, State, PBTOptState]:
+        """Apply exploit_and_explore() only after the warmup iterations.
+
+        exploit_and_explore() is always computed and its results are discarded by
+        a masked select during warmup, which keeps the graph free of `lax.cond`.
+        """
+        in_warmup = iterations + 1 <= self.warmup_iters
+
+        new_pop, new_pop_workflow_state, new_pbt_opt_state = self.exploit_and_explore(
+            pbt_opt_state, pop, pop_workflow_state, pop_metrics, key
+        )
+
+        return jtu.tree_map(
+            lambda old, new: jnp.where(in_warmup, old, new),
+            (pop, pop_workflow_state, pbt_opt_state),
+            (new_pop, new_pop_workflow_state, new_pbt_opt_state),
+        )
+
     def apply_hyperparams_to_workflow_state(
         self, workflow_state: State, hyperparams: PyTreeDict[str, chex.Numeric]
     ) -> State:
         raise NotImplementedError
 
+    def apply_hyperparams_to_pop_workflow_state(
+        self, pop_workflow_state: State, pop: PyTreeDict[str, chex.Array]
+    ) -> State:
+        """Apply the hyperparameters of the whole population to their workflow states.
+
+        Each device only updates its local slice of the population, so no
+        cross-device communication is involved.
+        """
+        return shmap_vmap(
+            self.apply_hyperparams_to_workflow_state,
+            mesh=self.sharding.mesh,
+            in_specs=self.sharding.spec,
+            out_specs=self.sharding.spec,
+            check_rep=False,
+        )(pop_workflow_state, pop)
+
     @classmethod
     def enable_jit(cls) -> None:
         cls.setup = jax.jit(cls.setup, static_argnums=(0,))
         cls.evaluate = jax.jit(cls.evaluate, static_argnums=(0,))
         cls.step = jax.jit(cls.step, static_argnums=(0,))
+        cls._multi_steps = jax.jit(cls._multi_steps, static_argnums=(0, 2))
 
 
 class PBTWorkflowTemplate(PBTWorkflowBase):
@@ -379,8 +493,10 @@ class PBTWorkflowTemplate(PBTWorkflowBase):
             tops_num=round(config.pop_size * config.top_ratio),
         )
 
-        parents = tree_get(pop, top_indices)
-        parents_wf_state = tree_get(pop_workflow_state, top_indices)
+        # each bottom is replaced by its chosen top, others are kept as is.
+        pop_size = config.pop_size
+        src_indices = jnp.arange(pop_size).at[bottom_indices].set(top_indices)
+        bottom_mask = jnp.zeros(pop_size, dtype=jnp.bool_).at[bottom_indices].set(True)
 
         offsprings = jax.vmap(
             partial(
@@ -388,28 +504,27 @@ class PBTWorkflowTemplate(PBTWorkflowBase):
                 perturb_factor=config.perturb_factor,
                 search_space=config.search_space,
             )
-        )(parents, jax.random.split(explore_key, bottom_indices.shape[0]))
-
-        # Note: no need to deepcopy parents_wf_state here, since it should be
-        # ensured immutable in apply_hyperparams_to_workflow_state()
-        offsprings_workflow_state = jax.vmap(self.apply_hyperparams_to_workflow_state)(
-            parents_wf_state, offsprings
-        )
+        )(tree_get(pop, src_indices), jax.random.split(explore_key, pop_size))
 
         # ==== survival | merge population ====
-        pop = tree_set(pop, offsprings, bottom_indices, unique_indices=True)
-        # we copy wf_state back to offspring wf_state
-        pop_workflow_state = tree_set(
-            pop_workflow_state,
-            offsprings_workflow_state,
-            bottom_indices,
-            unique_indices=True,
+        pop = jtu.tree_map(lambda x, y: jnp.where(bottom_mask, y, x), pop, offsprings)
+        # we copy parents' wf_state to offspring wf_state with a single gather.
+        # Note: no need to deepcopy parents' wf_state here, since it should be
+        # ensured immutable in apply_hyperparams_to_workflow_state()
+        pop_workflow_state = tree_get(pop_workflow_state, src_indices)
+        pop_workflow_state = self.apply_hyperparams_to_pop_workflow_state(
+            pop_workflow_state, pop
         )
 
         return pop, pop_workflow_state, pbt_opt_state
 
     def _record_step_metrics(self, train_metrics, workflow_metrics, iters):
         train_metrics_dict = train_metrics.to_local_dict()
+        if self.config.skip_warmup_eval and iters <= self.warmup_iters:
+            # no evaluation is performed during warmup
+            train_metrics_dict.update(
+                pop_episode_returns=None, pop_episode_lengths=None
+            )
 
         pop_train_metric = train_metrics_dict["pop_train_metrics"]
         if "train_episode_return" in pop_train_metric:
@@ -438,15 +553,41 @@ class PBTWorkflowTemplate(PBTWorkflowBase):
         self.recorder.write(workflow_metrics.to_local_dict(), iters)
         self.recorder.write(train_metrics_dict, iters)
 
+    def _save_checkpoint(self, iters: int, state: State) -> None:
+        self.checkpoint_manager.save(iters, args=ocp.args.StandardSave(state))
+
     def learn(self, state: State) -> State:
-        for i in range(state.metrics.iterations, self.config.num_iters):
-            iters = i + 1
-            train_metrics, state = self.step(state)
-            workflow_metrics = state.metrics
+        num_iters = self.config.num_iters
+        eval_interval = self.config.eval_interval
+        save_interval = self.config.checkpoint.save_interval_steps
+
+        i = int(state.metrics.iterations)
+        while i < num_iters:
+            # run up to `num_jitted_iters` iterations per host sync, and stop
+            # early at the next eval or checkpoint boundary.
+            num_steps = min(
+                self.config.num_jitted_iters,
+                num_iters - i,
+                eval_interval - i % eval_interval,
+                save_interval - i % save_interval,
+            )
+            train_metrics, workflow_metrics, state = self._multi_steps(
+                state, num_steps
+            )
+            # transfer the stacked metrics to host once per `num_steps` iters
+            train_metrics, workflow_metrics = jax.device_get(
+                (train_metrics, workflow_metrics)
+            )
+
+            for j in range(num_steps):
+                self._record_step_metrics(
+                    tree_get(train_metrics, j), tree_get(workflow_metrics, j), i + j + 1
+                )
 
-            self._record_step_metrics(train_metrics, workflow_metrics, iters)
+            i += num_steps
+            iters = i
 
-            if iters % self.config.eval_interval == 0 or iters == self.config.num_iters:
+            if iters % eval_interval == 0 or iters == num_iters:
                 eval_metrics, state = self.evaluate(state)
 
                 eval_metrics_dict = jtu.tree_map(
@@ -456,7 +597,7 @@ class PBTWorkflowTemplate(PBTWorkflowBase):
 
                 self.recorder.write(add_prefix(eval_metrics_dict, "eval"), iters)
 
-            self.checkpoint_manager.save(iters, args=ocp.args.StandardSave(state))
+            self._save_checkpoint(iters, state)
 
         return state
 
@@ -587,7 +728,7 @@ class PBTOffpolicyWorkflowTemplate(PBTWorkflowTemplate):
                     wf_state = wf_state.replace(replay_buffer_state=None)
                     return train_metrics, wf_state
 
-                pop_train_metrics, pop_wf_state = jax.vmap(_wf_step_wrapper)(
+                pop_train_metrics, pop_wf_state = self._pop_vmap(_wf_step_wrapper)(
                     pop_wf_state
                 )
 
@@ -625,32 +766,18 @@ class PBTOffpolicyWorkflowTemplate(PBTWorkflowTemplate):
         )(pop_workflow_state, replay_buffer_state)
 
         # ===== eval ======
-        eval_fn = shmap_vmap(
-            self.workflow.evaluate,
-            mesh=self.sharding.mesh,
-            in_specs=self.sharding.spec,
-            out_specs=self.sharding.spec,
-            check_rep=False,
+        pop_eval_metrics, pop_workflow_state = self._evaluate_pop_workflow_state(
+            state.metrics.iterations, pop_workflow_state
         )
 
-        pop_eval_metrics, pop_workflow_state = eval_fn(pop_workflow_state)
-
         # customize your pop metrics here
         pop_episode_returns = pop_eval_metrics.episode_returns
 
         # ===== warmup or exploit & explore ======
         key, exploit_and_explore_key = jax.random.split(state.key)
 
-        def _dummy_fn(pbt_opt_state, pop, pop_workflow_state, pop_metrics, key):
-            return pop, pop_workflow_state, pbt_opt_state
-
-        pop, pop_workflow_state, pbt_opt_state = jax.lax.cond(
-            state.metrics.iterations + 1
-            <= math.ceil(
-                self.config.warmup_steps / self.config.workflow_steps_per_iter
-            ),
-            _dummy_fn,
-            self.exploit_and_explore,
+        pop, pop_workflow_state, pbt_opt_state = self._masked_exploit_and_explore(
+            state.metrics.iterations,
             pbt_opt_state,
             pop,
             pop_workflow_state,
@@ -685,6 +812,11 @@ class PBTOffpolicyWorkflowTemplate(PBTWorkflowTemplate):
 
     def _record_step_metrics(self, train_metrics, workflow_metrics, iters):
         train_metrics_dict = train_metrics.to_local_dict()
+        if self.config.skip_warmup_eval and iters <= self.warmup_iters:
+            # no evaluation is performed during warmup
+            train_metrics_dict.update(
+                pop_episode_returns=None, pop_episode_lengths=None
+            )
 
         train_metrics_dict["pop_episode_returns"] = get_1d_array_statistics(
             train_metrics_dict["pop_episode_returns"], histogram=True
@@ -700,33 +832,14 @@ class PBTOffpolicyWorkflowTemplate(PBTWorkflowTemplate):
         self.recorder.write(workflow_metrics.to_local_dict(), iters)
         self.recorder.write(train_metrics_dict, iters)
 
-    def learn(self, state: State) -> State:
-        for i in range(state.metrics.iterations, self.config.num_iters):
-            iters = i + 1
-            train_metrics, state = self.step(state)
-            workflow_metrics = state.metrics
-
-            self._record_step_metrics(train_metrics, workflow_metrics, iters)
-
-            if iters % self.config.eval_interval == 0 or iters == self.config.num_iters:
-                eval_metrics, state = self.evaluate(state)
-
-                eval_metrics_dict = jtu.tree_map(
-                    get_1d_array,
-                    eval_metrics.to_local_dict(),
-                )
-
-                self.recorder.write(add_prefix(eval_metrics_dict, "eval"), iters)
-
-            saved_state = state
-            if not self.config.save_replay_buffer:
-                saved_state = skip_replay_buffer_state(saved_state)
-            self.checkpoint_manager.save(
-                iters,
-                args=ocp.args.StandardSave(saved_state),
-            )
-
-        return state
+    def _save_checkpoint(self, iters: int, state: State) -> None:
+        saved_state = state
+        if not self.config.save_replay_buffer:
+            saved_state = skip_replay_buffer_state(saved_state)
+        self.checkpoint_manager.save(
+            iters,
+            args=ocp.args.StandardSave(saved_state),
+        )
 
     @classmethod
     def enable_jit(cls) -> None:
@@ -1,6 +1,6 @@
 import logging
 import math
-from functools import partial
+from functools import cached_property
 from typing import Any
 from omegaconf import DictConfig
 
@@ -8,7 +8,6 @@ import chex
 import flax.linen as nn
 import jax
 import jax.numpy as jnp
-import jax.tree_util as jtu
 import optax
 import orbax.checkpoint as ocp
 
@@ -33,7 +32,14 @@ from evorl.types import (
     pytree_field,
 )
 from evorl.utils import running_statistics
-from evorl.utils.jax_utils import tree_stop_gradient, scan_and_mean
+from evorl.utils.jax_utils import (
+    tree_stop_gradient,
+    scan_and_mean,
+    enable_compilation_cache,
+    tree_pack,
+    tree_unpack,
+    rng_split_by_shape,
+)
 from evorl.utils.rl_toolkits import (
     average_episode_discount_return,
     compute_gae,
@@ -139,8 +145,8 @@ class PPOAgent(Agent):
         if self.normalize_obs:
             obs = self.obs_preprocessor(obs, agent_state.obs_preprocessor_state)
 
-        # mask invalid transitions at autoreset
-        mask = jnp.logical_not(sample_batch.extras.env_extras.autoreset)
+        # mask invalid transitions at autoreset, precomputed in the workflow
+        mask = sample_batch.extras.mask
 
         # ======= critic =======
         vs = self.value_network.apply(agent_state.params.value_params, obs)
@@ -208,6 +214,8 @@ def make_mlp_ppo_agent(
     actor_hidden_layer_sizes: tuple[int] = (256, 256),
     critic_hidden_layer_sizes: tuple[int] = (256, 256),
     normalize_obs: bool = False,
+    matmul_precision: str | None = None,
+    compute_dtype: str | None = None,
 ):
     if isinstance(action_space, Box):
         action_size = action_space.shape[0] * 2
@@ -221,9 +229,15 @@ def make_mlp_ppo_agent(
     policy_network = make_policy_network(
         action_size=action_size,
         hidden_layer_sizes=actor_hidden_layer_sizes,
+        precision=matmul_precision,
+        dtype=compute_dtype,
     )
 
-    value_network = make_v_network(hidden_layer_sizes=critic_hidden_layer_sizes)
+    value_network = make_v_network(
+        hidden_layer_sizes=critic_hidden_layer_sizes,
+        precision=matmul_precision,
+        dtype=compute_dtype,
+    )
 
     if normalize_obs:
         obs_preprocessor = running_statistics.normalize
@@ -270,6 +284,8 @@ class PPOWorkflow(OnPolicyWorkflow):
 
     @classmethod
     def _build_from_config(cls, config: DictConfig):
+        enable_compilation_cache()
+
         max_episode_steps = config.env.max_episode_steps
 
         env = create_env(
@@ -285,6 +301,8 @@ class PPOWorkflow(OnPolicyWorkflow):
             actor_hidden_layer_sizes=config.agent_network.actor_hidden_layer_sizes,
             critic_hidden_layer_sizes=config.agent_network.critic_hidden_layer_sizes,
             normalize_obs=config.normalize_obs,
+            matmul_precision=config.agent_network.matmul_precision,
+            compute_dtype=config.agent_network.compute_dtype,
         )
 
         if (
@@ -319,6 +337,26 @@ class PPOWorkflow(OnPolicyWorkflow):
 
         return cls(env, agent, optimizer, evaluator, config)
 
+    def _loss_fn(self, agent_state, sample_batch, key):
+        # learn all data from trajectory
+        loss_dict = self.agent.loss(agent_state, sample_batch, key)
+        loss_weights = self.config.loss_weights
+        loss = jnp.zeros(())
+        for loss_key in loss_weights.keys():
+            loss += loss_weights[loss_key] * loss_dict[loss_key]
+
+        return loss, loss_dict
+
+    @cached_property
+    def _update_fn(self):
+        # build the gradient update function once, instead of in every step() trace
+        return agent_gradient_update(
+            self._loss_fn,
+            self.optimizer,
+            pmap_axis_name=self.pmap_axis_name,
+            has_aux=True,
+        )
+
     def step(self, state: State) -> tuple[MetricBase, State]:
         key, rollout_key, learn_key = jax.random.split(state.key, num=3)
 
@@ -350,35 +388,37 @@ class PPOWorkflow(OnPolicyWorkflow):
         )
 
         # ======== compute GAE =======
-        _obs = jnp.concatenate([trajectory.obs, trajectory.next_obs[-1:]], axis=0)
-        # concat [values, bootstrap_value]
-        vs = self.agent.compute_values(state.agent_state, SampleBatch(obs=_obs))
+        # concat [values, bootstrap_value] instead of [obs, bootstrap_obs],
+        # which avoids materializing a [T+1, B, ...] copy of the observations
+        vs = self.agent.compute_values(
+            state.agent_state, SampleBatch(obs=trajectory.obs)
+        )
+        bootstrap_vs = self.agent.compute_values(
+            state.agent_state, SampleBatch(obs=trajectory.next_obs[-1:])
+        )
+        vs = jnp.concatenate([vs, bootstrap_vs], axis=0)
         v_targets, advantages = compute_gae(
             rewards=trajectory.rewards,
             values=vs,
             dones=trajectory.dones,
             gae_lambda=self.config.gae_lambda,
             discount=self.config.discount,
+            compute_dtype=self.config.gae_compute_dtype,
         )
         trajectory.extras.v_targets = jax.lax.stop_gradient(v_targets)
         trajectory.extras.advantages = jax.lax.stop_gradient(advantages)
         # [T,B,...] -> [T*B,...]
         trajectory = tree_stop_gradient(flatten_rollout_trajectory(trajectory))
+        # mask invalid transitions at autoreset
+        trajectory.extras.mask = jnp.logical_not(
+            trajectory.extras.env_extras.autoreset
+        )
+        # pack the leaves once into one [T*B, D] buffer per dtype, so each epoch
+        # gathers its minibatches with one kernel per dtype
+        packed_trajectory, trajectory_layout = tree_pack(trajectory, batch_ndim=1)
         # ============================
 
-        def loss_fn(agent_state, sample_batch, key):
-            # learn all data from trajectory
-            loss_dict = self.agent.loss(agent_state, sample_batch, key)
-            loss_weights = self.config.loss_weights
-            loss = jnp.zeros(())
-            for loss_key in loss_weights.keys():
-                loss += loss_weights[loss_key] * loss_dict[loss_key]
-
-            return loss, loss_dict
-
-        update_fn = agent_gradient_update(
-            loss_fn, self.optimizer, pmap_axis_name=self.pmap_axis_name, has_aux=True
-        )
+        update_fn = self._update_fn
 
         num_minibatches = (
             self.config.rollout_length
@@ -386,40 +426,48 @@ class PPOWorkflow(OnPolicyWorkflow):
             // self.config.minibatch_size
         )
 
-        def _get_shuffled_minibatch(perm_key, x):
-            x = x[jax.random.permutation(perm_key, x.shape[0])][
-                : num_minibatches * self.config.minibatch_size
-            ]
-            return x.reshape(num_minibatches, self.config.minibatch_size, *x.shape[1:])
-
-        def minibatch_step(carry, trajectory):
-            opt_state, agent_state, key = carry
-            key, learn_key = jax.random.split(key)
+        def minibatch_step(carry, xs):
+            opt_state, agent_state = carry
+            packed_minibatch, learn_key = xs
+            minibatch = tree_unpack(packed_minibatch, trajectory_layout)
 
             (loss, loss_dict), agent_state, opt_state = update_fn(
-                opt_state, agent_state, trajectory, learn_key
+                opt_state, agent_state, minibatch, learn_key
             )
 
-            return (opt_state, agent_state, key), (loss, loss_dict)
+            return (opt_state, agent_state), (loss, loss_dict)
 
-        def epoch_step(carry, _):
-            opt_state, agent_state, key = carry
-            perm_key, learn_key = jax.random.split(key, num=2)
+        def epoch_step(carry, keys):
+            opt_state, agent_state = carry
+            perm_key, learn_keys = keys[0], keys[1:]
 
-            (opt_state, agent_state, key), (loss, loss_dict) = scan_and_mean(
+            # share one permutation across all leaves of the trajectory
+            perm = jax.random.permutation(
+                perm_key, self.config.rollout_length * self.config.num_envs
+            )[: num_minibatches * self.config.minibatch_size].reshape(
+                num_minibatches, self.config.minibatch_size
+            )
+
+            (opt_state, agent_state), (loss, loss_dict) = scan_and_mean(
                 minibatch_step,
-                (opt_state, agent_state, learn_key),
-                jtu.tree_map(partial(_get_shuffled_minibatch, perm_key), trajectory),
+                (opt_state, agent_state),
+                (tuple(x[perm] for x in packed_trajectory), learn_keys),
                 length=num_minibatches,
             )
 
-            return (opt_state, agent_state, key), (loss, loss_dict)
+            return (opt_state, agent_state), (loss, loss_dict)
+
+        # split all keys up-front instead of carrying a key through the scans:
+        # [reuse_rollout_epochs, 1 + num_minibatches, 2]
+        epoch_keys = rng_split_by_shape(
+            learn_key, (self.config.reuse_rollout_epochs, 1 + num_minibatches)
+        )
 
         # loss_list: [reuse_rollout_epochs, num_minibatches]
-        (opt_state, agent_state, _), (loss, loss_dict) = scan_and_mean(
+        (opt_state, agent_state), (loss, loss_dict) = scan_and_mean(
             epoch_step,
-            (state.opt_state, agent_state, learn_key),
-            None,
+            (state.opt_state, agent_state),
+            epoch_keys,
             length=self.config.reuse_rollout_epochs,
         )
 
@@ -460,8 +508,10 @@ class PPOWorkflow(OnPolicyWorkflow):
             workflow_metrics = state.metrics
 
             iters = i + 1
-            train_metrics = unpmap(train_metrics, self.pmap_axis_name)
-            workflow_metrics = unpmap(workflow_metrics, self.pmap_axis_name)
+            # fetch all metrics to host in a single transfer
+            train_metrics, workflow_metrics = jax.device_get(
+                unpmap((train_metrics, workflow_metrics), self.pmap_axis_name)
+            )
 
             self.recorder.write(workflow_metrics.to_local_dict(), iters)
             train_metric_data = train_metrics.to_local_dict()
@@ -2,6 +2,7 @@ from .comm import (
     get_global_ranks,
     get_process_id,
     is_dist_initialized,
+    local_devices,
     pmax,
     pmean,
     pmin,
@@ -9,6 +10,7 @@ from .comm import (
     unpmap,
     all_gather,
     split_key_to_devices,
+    split_keys_to_devices,
 )
 from .gradients import agent_gradient_update, gradient_update
 from .sharding import shmap_vmap, shmap_map, tree_device_put
@@ -22,6 +24,7 @@ __all__ = [
     "get_global_ranks",
     "get_process_id",
     "is_dist_initialized",
+    "local_devices",
     "pmax",
     "pmean",
     "pmin",
@@ -29,6 +32,7 @@ __all__ = [
     "unpmap",
     "all_gather",
     "split_key_to_devices",
+    "split_keys_to_devices",
     "agent_gradient_update",
     "gradient_update",
     "shmap_vmap",
@@ -1,4 +1,5 @@
 from collections.abc import Sequence
+from functools import lru_cache
 
 import chex
 import jax
@@ -55,11 +56,32 @@ def all_gather(x, axis_name: str | None = None, **kwargs):
         return jax.lax.all_gather(x, axis_name, **kwargs)
 
 
+@lru_cache(maxsize=1)
+def local_devices() -> tuple[jax.Device, ...]:
+    """Cached version of `jax.local_devices()`.
+
+    The local devices are fixed once the backend is initialized, so query the
+    XLA client only once for all workflow instances.
+    """
+    return tuple(jax.local_devices())
+
+
 def split_key_to_devices(key: chex.PRNGKey, devices: Sequence[jax.Device]):
     """Split the key to each device."""
     return jax.device_put_sharded(tuple(jax.random.split(key, len(devices))), devices)
 
 
+def split_keys_to_devices(
+    keys: Sequence[chex.PRNGKey], devices: Sequence[jax.Device]
+) -> tuple[chex.PRNGKey, ...]:
+    """Split multiple keys to each device with a single transfer.
+
+    Equivalent to calling `split_key_to_devices()` on each key.
+    """
+    split_keys = [jax.random.split(key, len(devices)) for key in keys]
+    return tuple(jax.device_put_sharded(list(zip(*split_keys)), devices))
+
+
 def is_dist_initialized():
     """Whether the JAX's distributed setting is initialized."""
     # Note: global_state is a JAX internal API, which is not stable.
@@ -86,6 +108,6 @@ def get_global_ranks():
     ranks = process_id * num_local_devices + jnp.arange(
         num_local_devices, dtype=jnp.int32
     )
-    ranks = jax.device_put_sharded(tuple(ranks), jax.local_devices())
+    ranks = jax.device_put_sharded(tuple(ranks), list(local_devices()))
 
     return ranks
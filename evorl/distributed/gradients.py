@@ -2,7 +2,9 @@ from collections.abc import Callable
 
 import chex
 import jax
+import jax.tree_util as jtu
 import optax
+from jax.flatten_util import ravel_pytree
 
 """Training gradient utility functions.
 
@@ -10,14 +12,44 @@ Modified from https://github.com/google/brax/blob/main/brax/training/gradients.p
 """
 
 
+def fused_apply_updates(
+    params: chex.ArrayTree, updates: chex.ArrayTree
+) -> chex.ArrayTree:
+    """Apply the updates to the params as a single flat vector addition.
+
+    A drop-in replacement of `optax.apply_updates`. The params and updates are
+    raveled into flat vectors, added once and unraveled back, instead of one add
+    per leaf. Falls back to `optax.apply_updates` when the params have mixed dtypes
+    or the updates do not match the structure of the params (eg: `None` updates).
+    """
+    if jtu.tree_structure(params) != jtu.tree_structure(updates) or (
+        len({x.dtype for x in jtu.tree_leaves(params)}) > 1
+    ):
+        return optax.apply_updates(params, updates)
+
+    params_flat, unravel_fn = ravel_pytree(params)
+    updates_flat, _ = ravel_pytree(updates)
+
+    return unravel_fn(params_flat + updates_flat.astype(params_flat.dtype))
+
+
 def loss_and_pgrad(
-    loss_fn: Callable[..., float], pmap_axis_name: str | None, has_aux: bool = False
+    loss_fn: Callable[..., float],
+    pmap_axis_name: str | None,
+    has_aux: bool = False,
+    fused_allreduce: bool = True,
 ):
     g = jax.value_and_grad(loss_fn, has_aux=has_aux)
 
     def h(*args, **kwargs):
         value, grads = g(*args, **kwargs)
-        return value, jax.lax.pmean(grads, axis_name=pmap_axis_name)
+        if fused_allreduce:
+            # one all-reduce on the raveled grads instead of one per leaf
+            grads_flat, unravel_fn = ravel_pytree(grads)
+            grads = unravel_fn(jax.lax.pmean(grads_flat, axis_name=pmap_axis_name))
+        else:
+            grads = jax.lax.pmean(grads, axis_name=pmap_axis_name)
+        return value, grads
 
     return g if pmap_axis_name is None else h
 
@@ -27,6 +59,7 @@ def gradient_update(
     optimizer: optax.GradientTransformation,
     pmap_axis_name: str | None,
     has_aux: bool = False,
+    fused_allreduce: bool = True,
 ):
     """Wrapper of the loss function that apply gradient updates.
 
@@ -35,6 +68,8 @@ def gradient_update(
         optimizer: The optimizer to apply gradients.
         pmap_axis_name: If relevant, the name of the pmap axis to synchronize gradients.
         has_aux: Whether the loss_fn has auxiliary data.
+        fused_allreduce: Whether to synchronize the raveled gradients with a single
+            `pmean`, instead of one `pmean` per leaf.
 
     Returns:
         A function that takes the same argument as the loss function plus the
@@ -42,13 +77,16 @@ def gradient_update(
         and the new optimizer state.
     """
     loss_and_pgrad_fn = loss_and_pgrad(
-        loss_fn, pmap_axis_name=pmap_axis_name, has_aux=has_aux
+        loss_fn,
+        pmap_axis_name=pmap_axis_name,
+        has_aux=has_aux,
+        fused_allreduce=fused_allreduce,
     )
 
     def f(opt_state, params, *args, **kwargs):
         value, grads = loss_and_pgrad_fn(params, *args, **kwargs)
         params_update, opt_state = optimizer.update(grads, opt_state)
-        params = optax.apply_updates(params, params_update)
+        params = fused_apply_updates(params, params_update)
         return (
             value,
             params,
@@ -77,13 +115,18 @@ def agent_gradient_update(
     detach_fn: Callable[
         [chex.ArrayTree, chex.ArrayTree], chex.ArrayTree
     ] = _detach_params_to_agent_state,
+    fused_allreduce: bool = True,
 ):
     def _loss_fn(params, agent_state, sample_batch, key):
         agent_state = attach_fn(agent_state, params)
         return loss_fn(agent_state, sample_batch, key)
 
     _gradient_update_fn = gradient_update(
-        _loss_fn, optimizer, pmap_axis_name=pmap_axis_name, has_aux=has_aux
+        _loss_fn,
+        optimizer,
+        pmap_axis_name=pmap_axis_name,
+        has_aux=has_aux,
+        fused_allreduce=fused_allreduce,
     )
 
     def f(opt_state, agent_state, *args, **kwargs):
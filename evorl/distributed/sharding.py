@@ -10,11 +10,26 @@ def tree_device_put(tree: chex.ArrayTree, device_or_sharding):
     return jax.tree_map(lambda x: jax.device_put(x, device_or_sharding), tree)
 
 
-def shmap_vmap(fn: Callable, mesh, in_specs, out_specs, **kwargs):
-    """Vmap on different gpu."""
+def shmap_vmap(
+    fn: Callable, mesh, in_specs, out_specs, batch_size: int | None = None, **kwargs
+):
+    """Vmap on different gpu.
+
+    Args:
+        fn: function to be executed, only positional arguments are supported
+        batch_size: When set, the local data on each device is processed in chunks
+            of `batch_size` by `jax.lax.map`, and vmapped within each chunk. This
+            caps the peak memory. Default to vmap all local data at once.
+
+    Returns:
+        A wrapped function.
+    """
 
     def shmap_f(*args):
-        return jax.vmap(fn)(*args)
+        if batch_size is None:
+            return jax.vmap(fn)(*args)
+        else:
+            return jax.lax.map(lambda x: fn(*x), args, batch_size=batch_size)
 
     return shard_map(
         shmap_f, mesh=mesh, in_specs=in_specs, out_specs=out_specs, **kwargs
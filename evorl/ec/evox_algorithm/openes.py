@@ -22,15 +22,13 @@ def compute_ranks(x):
     Note: This is different from scipy.stats.rankdata, which returns ranks in [1, len(x)].
     """
     assert x.ndim == 1
-    ranks = invert_permutation(jnp.argsort(x))
-    return ranks
+    # scatter the positions instead of a second argsort: O(N) vs O(N log N)
+    return invert_permutation(jnp.argsort(x))
 
 
 def compute_centered_ranks(x):
-    y = compute_ranks(x)
-    y /= x.size - 1
-    y -= 0.5
-    return y
+    # keep the fitness dtype (eg: float64 under x64) instead of forcing float32
+    return compute_ranks(x).astype(x.dtype) / (x.size - 1) - 0.5
 
 
 class OpenES(Algorithm):
@@ -71,25 +71,33 @@ class ERLGA(EvoOptimizer):
         self, state: ERLGAState, fitnesses: chex.Array
     ) -> tuple[PyTreeDict, ERLGAState]:
         # Note: We simplify the update in ERL
-        key, select_key, mutate_key, crossover_key = jax.random.split(state.key, 4)
+        key, select_key, mutate_key, crossover_key = (
+            jax.random.fold_in(state.key, i) for i in range(4)
+        )
 
-        elite_indices = jnp.argsort(fitnesses, descending=True)[: self.num_elites]
-        elites = tree_get(state.pop, elite_indices)
+        # partial top-k selection instead of a full sort of the population
+        _, elite_indices = jax.lax.top_k(fitnesses, self.num_elites)
 
+        real_num_parents = self.pop_size - self.num_elites
         if self.enable_crossover:
-            real_num_parents = self.pop_size - self.num_elites
             num_parents = math.ceil((real_num_parents) / 2) * 2
-            parents_indices = self.select_parents(fitnesses, num_parents, select_key)
-            parents = tree_get(state.pop, parents_indices)
+        else:
+            num_parents = real_num_parents
+        parents_indices = self.select_parents(fitnesses, num_parents, select_key)
+
+        # gather elites and parents together with one gather per leaf
+        selected = tree_get(
+            state.pop, jnp.concatenate([elite_indices, parents_indices])
+        )
+        elites = tree_get(selected, slice(self.num_elites))
+        parents = tree_get(selected, slice(self.num_elites, None))
 
+        if self.enable_crossover:
             offsprings = self.crossover(parents, crossover_key)
             if real_num_parents % 2 != 0:
                 offsprings = tree_get(offsprings, slice(real_num_parents))
             offsprings = self.mutate(offsprings, mutate_key)
         else:
-            num_parents = self.pop_size - self.num_elites
-            parents_indices = self.select_parents(fitnesses, num_parents, select_key)
-            parents = tree_get(state.pop, parents_indices)
             offsprings = self.mutate(parents, mutate_key)
 
         new_pop = jtu.tree_map(
@@ -119,18 +127,21 @@ class ERLGAMod(ERLGA):
         self, state: ERLGAModState, fitnesses: chex.Array
     ) -> tuple[PyTreeDict, ERLGAModState]:
         # Note: We simplify the update in ERL
-        key, select_key, mutate_key, crossover_key = jax.random.split(state.key, 4)
+        key, select_key, mutate_key, crossover_key = (
+            jax.random.fold_in(state.key, i) for i in range(4)
+        )
 
-        sorted_indices = jnp.argsort(fitnesses, descending=True)
-        elite_indices = sorted_indices[: self.num_elites]
+        # the top (pop_size - external_size) individuals in descending order,
+        # without a full sort of the population
+        _, selected_indices = jax.lax.top_k(
+            fitnesses, self.pop_size - self.external_size
+        )
+        elite_indices = selected_indices[: self.num_elites]
         elites = tree_get(state.pop, elite_indices)
 
         # unselected(worst) are replaced by external op (e.g: from RL)
-        # unselected_indices = sorted_indices[-self.external_size :]
         unselected = state.external_pop
 
-        selected_indices = sorted_indices[: -self.external_size]
-
         if self.enable_crossover:
             real_num_parents = self.pop_size - self.num_elites - self.external_size
             num_parents = math.ceil((real_num_parents) / 2) * 2
@@ -7,7 +7,7 @@ import jax.tree_util as jtu
 import optax
 
 from evorl.types import PyTreeData, pytree_field, Params, PyTreeDict
-from evorl.utils.jax_utils import rng_split_like_tree, invert_permutation
+from evorl.utils.jax_utils import rng_fold_in_like_tree, invert_permutation
 from evorl.utils.ec_utils import ParamVectorSpec
 
 from .utils import ExponentialScheduleSpec, weight_sum, optimizer_map
@@ -20,16 +20,14 @@ def compute_ranks(x):
     This is different from `scipy.stats.rankdata`, which returns ranks in [1, len(x)].
     """
     assert x.ndim == 1
-    ranks = invert_permutation(jnp.argsort(x))
-    return ranks
+    # scatter the positions instead of a second argsort: O(N) vs O(N log N)
+    return invert_permutation(jnp.argsort(x))
 
 
 def compute_centered_ranks(x):
     """Get centered ranks in [-0.5, 0.5]."""
-    y = compute_ranks(x)
-    y /= x.size - 1
-    y -= 0.5
-    return y
+    # keep the fitness dtype (eg: float64 under x64) instead of forcing float32
+    return compute_ranks(x).astype(x.dtype) / (x.size - 1) - 0.5
 
 
 class OpenESState(PyTreeData):
@@ -39,6 +37,7 @@ class OpenESState(PyTreeData):
     opt_state: optax.OptState
     noise_std: chex.Array
     key: chex.PRNGKey
+    # [pop_size//2, ...] when mirror_sampling is enabled, otherwise [pop_size, ...]
     noise: None | chex.ArrayTree = None
 
 
@@ -51,6 +50,8 @@ class OpenES(EvoOptimizer):
     mirror_sampling: bool = True
     optimizer_name: str = "adam"
     weight_decay: float | None = None
+    # dtype of the sampled noise, eg: "bfloat16" halves the noise memory traffic
+    noise_dtype: str = "float32"
 
     fitness_shaping_fn: Callable[[chex.Array], chex.Array] = pytree_field(
         static=True, default=compute_centered_ranks
@@ -82,27 +83,42 @@ class OpenES(EvoOptimizer):
     def ask(self, state: ECState) -> tuple[chex.ArrayTree, ECState]:
         """Generate new candidate solutions."""
         key, sample_key = jax.random.split(state.key)
-        sample_keys = rng_split_like_tree(sample_key, state.mean)
+        sample_keys = rng_fold_in_like_tree(sample_key, state.mean)
 
         if self.mirror_sampling:
             noise = jtu.tree_map(
-                lambda x, k: jax.random.normal(k, shape=(self.pop_size // 2, *x.shape)),
+                lambda x, k: jax.random.normal(
+                    k, shape=(self.pop_size // 2, *x.shape), dtype=self.noise_dtype
+                ),
                 state.mean,
                 sample_keys,
             )
-            noise = jtu.tree_map(lambda z: jnp.concatenate([z, -z], axis=0), noise)
+            # only store the first half noise, the second half is its negation
+            pop = jtu.tree_map(
+                lambda m, z: jnp.concatenate(
+                    [
+                        m + state.noise_std * z.astype(m.dtype),
+                        m - state.noise_std * z.astype(m.dtype),
+                    ],
+                    axis=0,
+                ),
+                state.mean,
+                noise,
+            )
         else:
             noise = jtu.tree_map(
-                lambda x, k: jax.random.normal(k, shape=(self.pop_size, *x.shape)),
+                lambda x, k: jax.random.normal(
+                    k, shape=(self.pop_size, *x.shape), dtype=self.noise_dtype
+                ),
                 state.mean,
                 sample_keys,
             )
 
-        pop = jtu.tree_map(
-            lambda m, z: m + state.noise_std * z,
-            state.mean,
-            noise,
-        )
+            pop = jtu.tree_map(
+                lambda m, z: m + state.noise_std * z.astype(m.dtype),
+                state.mean,
+                noise,
+            )
         state = state.replace(key=key, noise=noise)
 
         return pop, state
@@ -112,10 +128,18 @@ class OpenES(EvoOptimizer):
     ) -> tuple[PyTreeDict, OpenESState]:
         """Update the optimizer state based on the fitnesses of the candidate solutions."""
         transformed_fitnesses = self.fitness_shaping_fn(fitnesses)
+        if self.mirror_sampling:
+            # noise only has the first half z, the mirrored half -z contributes
+            # with the negative weights.
+            half = self.pop_size // 2
+            transformed_fitnesses = (
+                transformed_fitnesses[:half] - transformed_fitnesses[half:]
+            )
 
         # grad = 1/(N*sigma^2) * sum(F_i*(x_i-m))
         grad = jtu.tree_map(
             # Note: we need additional "-1.0" since we are maximizing the fitness
+            # the low precision noise is upcasted to the fitness dtype in the reduction
             lambda z: (
                 -weight_sum(z, transformed_fitnesses)
                 / (self.pop_size * state.noise_std)
@@ -207,7 +231,6 @@ class OpenESNoiseTable(EvoOptimizer):
     def ask(self, state: ECState) -> tuple[chex.ArrayTree, ECState]:
         """Generate new candidate solutions."""
         key, sample_key = jax.random.split(state.key)
-        # sample_keys = rng_split_like_tree(sample_key, state.mean)
 
         param_vec_spec = ParamVectorSpec(state.mean)
 
@@ -225,7 +248,14 @@ class OpenESNoiseTable(EvoOptimizer):
             )
             noise = param_vec_spec.to_tree(jax.vmap(sample_from_noise_table)(noise_idx))
 
-            noise = jtu.tree_map(lambda z: jnp.concatenate([z, -z], axis=0), noise)
+            # only store the first half noise, the second half is its negation
+            pop = jtu.tree_map(
+                lambda m, z: jnp.concatenate(
+                    [m + state.noise_std * z, m - state.noise_std * z], axis=0
+                ),
+                state.mean,
+                noise,
+            )
         else:
             noise_idx = jax.random.randint(
                 sample_key,
@@ -235,11 +265,11 @@ class OpenESNoiseTable(EvoOptimizer):
             )
             noise = param_vec_spec.to_tree(jax.vmap(sample_from_noise_table)(noise_idx))
 
-        pop = jtu.tree_map(
-            lambda m, z: m + state.noise_std * z,
-            state.mean,
-            noise,
-        )
+            pop = jtu.tree_map(
+                lambda m, z: m + state.noise_std * z,
+                state.mean,
+                noise,
+            )
         state = state.replace(key=key, noise=noise)
 
         return pop, state
@@ -249,6 +279,13 @@ class OpenESNoiseTable(EvoOptimizer):
     ) -> tuple[PyTreeDict, OpenESState]:
         """Update the optimizer state based on the fitnesses of the candidate solutions."""
         transformed_fitnesses = self.fitness_shaping_fn(fitnesses)
+        if self.mirror_sampling:
+            # noise only has the first half z, the mirrored half -z contributes
+            # with the negative weights.
+            half = self.pop_size // 2
+            transformed_fitnesses = (
+                transformed_fitnesses[:half] - transformed_fitnesses[half:]
+            )
 
         # grad = 1/(N*sigma^2) * sum(F_i*(x_i-m))
         grad = jtu.tree_map(
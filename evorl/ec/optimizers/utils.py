@@ -31,5 +31,6 @@ def weight_sum(x: jax.Array, w: jax.Array) -> jax.Array:
     chex.assert_equal_shape_prefix((x, w), 1)
     assert w.ndim == 1
 
-    w = w.reshape(w.shape + (1,) * (x.ndim - 1))
-    return jnp.sum(x * w, axis=0)
+    # contract over the first axis as a single (n,) x (n, ...) reduction,
+    # without materializing the broadcasted product x * w.
+    return jnp.tensordot(w, x, axes=1, precision=jax.lax.Precision.HIGHEST)
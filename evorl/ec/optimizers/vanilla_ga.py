@@ -7,6 +7,7 @@ import jax.tree_util as jtu
 
 from evorl.types import PyTreeData, pytree_field, PyTreeDict
 from evorl.ec.operators import MLPMutation, MLPCrossover, TournamentSelection
+from evorl.utils.jax_utils import tree_get
 
 from .ec_optimizer import EvoOptimizer
 
@@ -76,15 +77,23 @@ class VanillaGA(EvoOptimizer):
         self, state: VanillaGAState, fitnesses: chex.Array
     ) -> tuple[PyTreeDict, VanillaGAState]:
         # Note: We simplify the update in ERL
-        key, select_key, mutate_key, crossover_key = jax.random.split(state.key, 4)
+        key, select_key, mutate_key, crossover_key = (
+            jax.random.fold_in(state.key, i) for i in range(4)
+        )
 
-        elite_indices = jnp.argsort(fitnesses, descending=True)[: self.num_elites]
-        elites = jtu.tree_map(lambda x: x[elite_indices], state.pop)
+        # partial top-k selection instead of a full sort of the population
+        _, elite_indices = jax.lax.top_k(fitnesses, self.num_elites)
 
         parents_indices = self.select_parents(
             fitnesses, self.pop_size - self.num_elites, select_key
         )
-        parents = jtu.tree_map(lambda x: x[parents_indices], state.pop)
+
+        # gather elites and parents together with one gather per leaf
+        selected = tree_get(
+            state.pop, jnp.concatenate([elite_indices, parents_indices])
+        )
+        elites = tree_get(selected, slice(self.num_elites))
+        parents = tree_get(selected, slice(self.num_elites, None))
 
         if self.enable_crossover:
             offsprings = self.crossover(parents, crossover_key)
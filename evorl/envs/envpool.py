@@ -28,9 +28,18 @@ def _to_jax_spec(pytree):
     return jtu.tree_map(lambda x: jax.ShapeDtypeStruct(x.shape, x.dtype), pytree)
 
 
-def _reshape_batch_dims(pytree, batch_shape):
-    # [B1*...*Bn*#envs, *] -> [B1, ..., Bn, #envs, *]
-    return jtu.tree_map(lambda x: jnp.reshape(x, batch_shape + x.shape[1:]), pytree)
+def _reshape_batch_dims(pytree, batch_shape, spec):
+    # [B1*...*Bn*#envs, *] -> [B1, ..., Bn, #envs, *], and cast to the dtypes in spec
+    # Note: use numpy inside the host callbacks to avoid extra device transfers.
+    return jtu.tree_map(
+        lambda x, s: np.asarray(x, dtype=s.dtype).reshape(batch_shape + x.shape[1:]),
+        pytree,
+        spec,
+    )
+
+
+# (env_name, env_backend, max_episode_steps, num_envs, env_kwargs) -> specs
+_callback_specs_cache = {}
 
 
 class EnvPoolGymAdapter(EnvAdapter):
@@ -44,6 +53,7 @@ class EnvPoolGymAdapter(EnvAdapter):
     - No support for recovering from previous env state.
         - In other word, you can't rewind after calling `env.step`.
         - For example, you can't resume the training from a checkpoint exactly as before; Similarly, `evorl.rollout.eval_rollout_episode` will also result in undefined behavior.
+    - `env.step` is a blocking host callback, and it is intentionally not pipelined with envpool's `send`/`recv` API. The next policy forward depends on the observations returned by this step, so a double-buffered step would have to return the observations of the previous step and feed stale observations to the policy.
     :::
     """
 
@@ -88,10 +98,16 @@ class EnvPoolGymAdapter(EnvAdapter):
 
         self._env_fn = _env_fn
         self.env = _env_fn(self.num_envs)
+        # spaces are fixed for the env, convert them once instead of per access
+        self._action_space = gym_space_to_evorl_space(self.env.action_space)
+        self._obs_space = gym_space_to_evorl_space(self.env.observation_space)
+
+        # avoid rebuilding self.action_space in every step callback
+        self._action_ndim = len(self.env.action_space.shape)
 
         self.setup_env_callback()
 
-    def setup_env_callback(self):
+    def _make_callback_specs(self):
         dummy_obs, _ = self.env.reset()
         # define your own dummy reset info
         dummy_reset_info = PyTreeDict()
@@ -105,6 +121,31 @@ class EnvPoolGymAdapter(EnvAdapter):
         dummy_step_info = PyTreeDict()
         step_spec = _to_jax_spec(self.env.step(dummy_actions)[:-1] + (dummy_step_info,))
 
+        return reset_spec, step_spec
+
+    def setup_env_callback(self):
+        # The specs only depend on the env config, so they are shared by adapters
+        # with the same config instead of probing the envpool on every creation.
+        # Note: the callbacks themselves are not shared, since they hold the
+        # envpool of each adapter.
+        try:
+            spec_key = (
+                self.env_name,
+                self.env_backend,
+                self.max_episode_steps,
+                self.num_envs,
+                tuple(sorted(self.env_kwargs.items())),
+            )
+            specs = _callback_specs_cache.get(spec_key)
+        except TypeError:  # unhashable env_kwargs
+            spec_key, specs = None, None
+
+        if specs is None:
+            specs = self._make_callback_specs()
+            if spec_key is not None:
+                _callback_specs_cache[spec_key] = specs
+        reset_spec, step_spec = specs
+
         def _reset(key):
             batch_shape = key.shape[:-1]
             num_envs = math.prod(batch_shape) * self.num_envs
@@ -113,8 +154,8 @@ class EnvPoolGymAdapter(EnvAdapter):
 
             assert self.env.config["num_envs"] == num_envs
 
-            obs, _info = _reshape_batch_dims(
-                self.env.reset(), batch_shape + (self.num_envs,)
+            obs = _reshape_batch_dims(
+                self.env.reset()[0], batch_shape + (self.num_envs,), reset_spec[0]
             )
 
             # drop the original info dict as they do not have static shape.
@@ -126,20 +167,22 @@ class EnvPoolGymAdapter(EnvAdapter):
             # Note: we are not sure if self.env is always updated by _reset in JIT mode.
 
             # [B1, ..., Bn, #envs]
-            batch_shape = actions.shape[: -len(self.action_space.shape)]
+            batch_shape = actions.shape[: actions.ndim - self._action_ndim]
 
             # [B1, ..., Bn, #envs, *] -> [B1*...*Bn*#envs, *]
-            actions = jax.lax.collapse(actions, 0, len(batch_shape))
+            # actions are already host numpy arrays in the callback, so reshape
+            # them with numpy instead of a round trip through a jax op.
+            actions = np.reshape(actions, (-1,) + actions.shape[len(batch_shape) :])
+            # no copy unless a dtype cast is needed
+            actions = np.asarray(actions, dtype=self.env.action_space.dtype)
 
-            obs, reward, termination, truncation, _info = self.env.step(
-                np.asarray(actions)
-            )
+            obs, reward, termination, truncation, _info = self.env.step(actions)
 
             # drop the original info dict as they do not have static shape.
             info = PyTreeDict()
 
             return _reshape_batch_dims(
-                (obs, reward, termination, truncation, info), batch_shape
+                (obs, reward, termination, truncation, info), batch_shape, step_spec
             )
 
         # You are entring the dangerous zone!!!
@@ -152,7 +195,8 @@ class EnvPoolGymAdapter(EnvAdapter):
         )
 
     def reset(self, key: chex.PRNGKey) -> EnvState:
-        obs, info = _to_jax(self._reset(key))
+        # the callbacks already return jax arrays matching reset_spec/step_spec
+        obs, info = self._reset(key)
 
         info.steps = jnp.zeros((self.num_envs,), dtype=jnp.int32)
         info.termination = jnp.zeros((self.num_envs,))
@@ -174,7 +218,7 @@ class EnvPoolGymAdapter(EnvAdapter):
     def step(self, state: EnvState, action: Action) -> EnvState:
         autorest = state.done  # True = this step is the reset() step
 
-        obs, reward, termination, truncation, info = _to_jax(self._step(action))
+        obs, reward, termination, truncation, info = self._step(action)
 
         reward = reward.astype(jnp.float32)
         done = (jnp.logical_or(termination, truncation)).astype(jnp.float32)
@@ -196,11 +240,11 @@ class EnvPoolGymAdapter(EnvAdapter):
 
     @property
     def action_space(self) -> Space:
-        return gym_space_to_evorl_space(self.env.action_space)
+        return self._action_space
 
     @property
     def obs_space(self) -> Space:
-        return gym_space_to_evorl_space(self.env.observation_space)
+        return self._obs_space
 
 
 # TODO: EnvPoolDMAdapter
@@ -213,11 +257,16 @@ class OneEpisodeWrapper(Wrapper):
     def step(self, state: EnvState, action: Action) -> EnvState:
         # Note: could add extra CPU overhead
 
+        # share one boolean mask across all leaves, only its broadcast view differs.
+        # Keep the select instead of a float blend `done*x + (1-done)*y`, which
+        # would propagate NaN/inf from the discarded branch.
+        done = state.done.astype(jnp.bool_)
+
         def where_done(x, y):
-            done = state.done
-            if done.ndim > 0:
-                done = jnp.reshape(done, [x.shape[0]] + [1] * (len(x.shape) - 1))  # type: ignore
-            return jnp.where(done, x, y)
+            mask = done
+            if mask.ndim > 0:
+                mask = jnp.expand_dims(mask, tuple(range(mask.ndim, x.ndim)))
+            return jnp.where(mask, x, y)
 
         return jtu.tree_map(
             where_done,
@@ -227,13 +276,16 @@ class OneEpisodeWrapper(Wrapper):
 
 
 def _inf_to_num(x, num=1e10):
-    return jnp.nan_to_num(x, posinf=num, neginf=-num)
+    # static space bounds: convert on the host with numpy, in jax's default dtype
+    x = np.asarray(x)
+    x = x.astype(jax.dtypes.canonicalize_dtype(x.dtype))
+    return jnp.asarray(np.nan_to_num(x, posinf=num, neginf=-num))
 
 
 def gym_space_to_evorl_space(space: gymnasium.Space | gym.Space) -> Space:
     if isinstance(space, gymnasium.spaces.Box) or isinstance(space, gym.spaces.Box):
-        low = _inf_to_num(jnp.asarray(space.low))
-        high = _inf_to_num(jnp.asarray(space.high))
+        low = _inf_to_num(space.low)
+        high = _inf_to_num(space.high)
         return Box(low=low, high=high)
     elif isinstance(space, gymnasium.spaces.Discrete) or isinstance(
         space, gym.spaces.Discrete
@@ -264,11 +264,16 @@ class OneEpisodeWrapper(Wrapper):
     def step(self, state: EnvState, action: Action) -> EnvState:
         # Note: could add extra CPU overhead
 
+        # share one boolean mask across all leaves, only its broadcast view differs.
+        # Keep the select instead of a float blend `done*x + (1-done)*y`, which
+        # would propagate NaN/inf from the discarded branch.
+        done = state.done.astype(jnp.bool_)
+
         def where_done(x, y):
-            done = state.done
-            if done.ndim > 0:
-                done = jnp.reshape(done, [x.shape[0]] + [1] * (len(x.shape) - 1))  # type: ignore
-            return jnp.where(done, x, y)
+            mask = done
+            if mask.ndim > 0:
+                mask = jnp.expand_dims(mask, tuple(range(mask.ndim, x.ndim)))
+            return jnp.where(mask, x, y)
 
         return jtu.tree_map(
             where_done,
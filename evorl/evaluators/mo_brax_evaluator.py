@@ -1,4 +1,3 @@
-import copy
 import logging
 from collections.abc import Callable
 from functools import partial
@@ -59,7 +58,7 @@ class BraxEvaluator(Evaluator):
                 env_reset_fn = jax.vmap(env_reset_fn)
                 env_step_fn = jax.vmap(env_step_fn)
 
-        metric_names = copy.deepcopy(tuple(self.metric_names))
+        metric_names = tuple(self.metric_names)
         # we also need episode_length to calculate the sampled_timesteps
         if "episode_lengths" not in metric_names:
             metric_names = metric_names + ("episode_lengths",)
@@ -70,15 +70,22 @@ class MetricBase(PyTreeData, kw_only=True):
         return to_local_dict(self)
 
 
+def _zero_counter() -> chex.Array:
+    # uint32 wraps around after ~4.3B timesteps, use uint64 when x64 is enabled.
+    # Resolved at instantiation, so it respects the x64 flag set after import.
+    dtype = jnp.uint64 if jax.config.jax_enable_x64 else jnp.uint32
+    return jnp.zeros((), dtype=dtype)
+
+
 class WorkflowMetric(MetricBase):
     """Workflow metrics for RLWorkflow.
 
     Attributes:
-        sampled_timesteps: The total number of sampled timesteps from environments.
+        sampled_timesteps: The total number of sampled timesteps from environments. Stored in uint64 when `jax_enable_x64` is enabled, otherwise uint32.
         iterations: The total number of workflow iterations.
     """
 
-    sampled_timesteps: chex.Array = jnp.zeros((), dtype=jnp.uint32)
+    sampled_timesteps: chex.Array = metric_field(default_factory=_zero_counter)
     iterations: chex.Array = jnp.zeros((), dtype=jnp.uint32)
 
 
@@ -21,6 +21,10 @@ class MLP(nn.Module):
     activation_final: ActivationFn | None = None
     use_bias: bool = True
     norm_layer: nn.Module | None = None
+    precision: Any = None
+    # computation dtype of the hidden layers, the output layer is computed in
+    # the dtype of params (eg: float32) for mixed precision.
+    dtype: Any = None
 
     @nn.compact
     def __call__(self, data: jax.Array):
@@ -31,6 +35,8 @@ class MLP(nn.Module):
                 name=f"hidden_{i}",
                 kernel_init=self.kernel_init,
                 use_bias=self.use_bias,
+                precision=self.precision,
+                dtype=self.dtype if i != len(self.layer_sizes) - 1 else None,
             )(hidden)
 
             if i != len(self.layer_sizes) - 1:
@@ -55,6 +61,7 @@ class SNMLP(nn.Module):
     kernel_init: Initializer = jax.nn.initializers.lecun_uniform()
     activation_final: ActivationFn | None = None
     use_bias: bool = True
+    precision: Any = None
 
     @nn.compact
     def __call__(self, data: jax.Array):
@@ -65,6 +72,7 @@ class SNMLP(nn.Module):
                 name=f"hidden_{i}",
                 kernel_init=self.kernel_init,
                 use_bias=self.use_bias,
+                precision=self.precision,
             )(hidden)
 
             if i != len(self.layer_sizes) - 1:
@@ -81,15 +89,30 @@ def make_mlp(
     activation_final: ActivationFn | None = None,
     use_bias: bool = True,
     norm_layer_type: str = "none",
+    precision: Any = None,
+    dtype: Any = None,
 ) -> nn.Module:
-    """Creates an MLP network."""
+    """Creates an MLP network.
+
+    Args:
+        precision: The matmul precision of the dense layers, see
+            `jax.lax.Precision`. Eg: "high" enables TF32 on Nvidia GPUs.
+        dtype: The computation dtype of the hidden layers, eg: bfloat16. Params
+            and outputs keep their original dtype. Not supported by spectral norm.
+    """
     if norm_layer_type == "spectral_norm":
+        if dtype is not None:
+            raise ValueError(
+                f"dtype={dtype} is not supported with norm_layer_type=spectral_norm"
+            )
+
         mlp = SNMLP(
             layer_sizes=layer_sizes,
             activation=activation,
             kernel_init=kernel_init,
             activation_final=activation_final,
             use_bias=use_bias,
+            precision=precision,
         )
     else:
         mlp = MLP(
@@ -99,6 +122,8 @@ def make_mlp(
             activation_final=activation_final,
             use_bias=use_bias,
             norm_layer=get_norm_layer(norm_layer_type),
+            precision=precision,
+            dtype=dtype,
         )
 
     return mlp
@@ -152,6 +177,8 @@ def make_policy_network(
     activation: ActivationFn = nn.relu,
     activation_final: ActivationFn | None = None,
     norm_layer_type: str = "none",
+    precision: Any = None,
+    dtype: Any = None,
 ) -> nn.Module:
     """Creates a policy network."""
     policy_model = make_mlp(
@@ -161,6 +188,8 @@ def make_policy_network(
         activation_final=activation_final,
         use_bias=use_bias,
         norm_layer_type=norm_layer_type,
+        precision=precision,
+        dtype=dtype,
     )
 
     return policy_model
@@ -171,6 +200,8 @@ def make_v_network(
     activation: ActivationFn = nn.relu,
     kernel_init: Initializer = jax.nn.initializers.lecun_uniform(),
     norm_layer_type: str = "none",
+    precision: Any = None,
+    dtype: Any = None,
 ) -> nn.Module:
     """Creates a V network: (obs) -> value."""
 
@@ -184,6 +215,8 @@ def make_v_network(
                 activation=activation,
                 kernel_init=kernel_init,
                 norm_layer_type=norm_layer_type,
+                precision=precision,
+                dtype=dtype,
             )(obs)
 
             return vs.squeeze(-1)
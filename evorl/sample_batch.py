@@ -40,8 +40,25 @@ class SampleBatch(PyTreeData):
     def reshape(self, shape: Sequence[int]) -> Any:
         return jtu.tree_map(lambda x: x.reshape(shape), self)
 
-    def select(self, o: Any, cond: jax.Array) -> Any:
-        return jtu.tree_map(lambda x, y: (x.T * cond + y.T * (1 - cond)).T, self, o)
+    def select(self, o: Any, cond: jax.Array | bool) -> Any:
+        """Select leaves from self where cond is True, otherwise from o.
+
+        cond is broadcast along the leading axes of each leaf and is interpreted
+        as a boolean mask: any nonzero value selects self. Unlike an arithmetic
+        blend, fractional conditions are not interpolated, and NaN/inf in the
+        unselected leaves do not leak into the result. When cond is a Python
+        scalar, return self or o directly without a tree traversal.
+        """
+        if isinstance(cond, (bool, int, float)):
+            return self if cond else o
+
+        cond = jnp.asarray(cond, dtype=jnp.bool_)
+
+        def _select(x, y):
+            cond_b = jnp.reshape(cond, cond.shape + (1,) * (x.ndim - cond.ndim))
+            return jnp.where(cond_b, x, y)
+
+        return jtu.tree_map(_select, self, o)
 
     def slice(self, beg: int, end: int) -> Any:
         return jtu.tree_map(lambda x: x[beg:end], self)
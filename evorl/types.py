@@ -147,6 +147,10 @@ def dataclass(clz: _T, *, pure_data=False, **kwargs) -> _T:
         else:
             data_fields.append(field_info.name)
 
+    # cache the field names once per class for the flatten/unflatten functions
+    meta_fields = tuple(meta_fields)
+    data_fields = tuple(data_fields)
+
     def replace(self, **updates):
         """Returns a new object replacing the specified fields with new values."""
         return dataclasses.replace(self, **updates)
@@ -172,9 +176,8 @@ def dataclass(clz: _T, *, pure_data=False, **kwargs) -> _T:
             return data, meta
 
         def clz_from_iterable(meta, data):
-            meta_args = tuple(zip(meta_fields, meta))
-            data_args = tuple(zip(data_fields, data))
-            kwargs = dict(meta_args + data_args)
+            kwargs = dict(zip(meta_fields, meta))
+            kwargs.update(zip(data_fields, data))
             return data_clz(**kwargs)
 
         jax.tree_util.register_pytree_with_keys(
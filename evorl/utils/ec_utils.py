@@ -1,9 +1,10 @@
+import numpy as np
 import jax
 
 from jax.flatten_util import ravel_pytree
 from jax.tree_util import tree_leaves
 
-__all__ = ["ParamVectorSpec"]
+__all__ = ["ParamVectorSpec", "rank_intersect"]
 
 
 class ParamVectorSpec:
@@ -60,3 +61,65 @@ class ParamVectorSpec:
             vmap_to_tree = jax.vmap(vmap_to_tree)
 
         return vmap_to_tree(x)
+
+
+def _packed_prefix_sets(x, sorted_x, inv_order, side):
+    """Packed bitsets of the solutions ranked before each solution on one objective.
+
+    Returns a uint8 array of shape [N, ceil(N/8)], where bit k of row i is set iff
+    `x[k] < x[i]` (side="left") or `x[k] <= x[i]` (side="right").
+    """
+    n = x.shape[0]
+    # number of solutions strictly better (side="left") or not worse ("right")
+    counts = np.searchsorted(sorted_x, x, side=side)
+    prefix = np.arange(n)[None, :] < counts[:, None]
+    # map the sorted positions back to the original solution indices
+    return np.packbits(prefix[:, inv_order], axis=1)
+
+
+def rank_intersect(fitnesses: np.ndarray) -> np.ndarray:
+    """Non-dominated sort by intersecting per-objective rank sets.
+
+    A host-side alternative of `evox.operators.non_dominated_sort`. Each objective
+    is sorted once, and the set of solutions better than each solution is stored
+    as a packed bitset. Dominance then reduces to bitwise AND/OR over the
+    objectives instead of pairwise comparisons of all objectives.
+
+    Args:
+        fitnesses: The fitnesses of shape [N, M] to be minimized.
+
+    Returns:
+        The front rank of each solution with shape [N], starting from 0.
+    """
+    fitnesses = np.asarray(fitnesses)
+    n, m = fitnesses.shape
+
+    # dominators of i: not worse on all objectives and better on at least one
+    not_worse = None
+    better = None
+    for j in range(m):
+        x = fitnesses[:, j]
+        order = np.argsort(x, kind="stable")
+        inv_order = np.empty_like(order)
+        inv_order[order] = np.arange(n)
+        sorted_x = x[order]
+
+        s_j = _packed_prefix_sets(x, sorted_x, inv_order, "right")
+        t_j = _packed_prefix_sets(x, sorted_x, inv_order, "left")
+        not_worse = s_j if not_worse is None else not_worse & s_j
+        better = t_j if better is None else better | t_j
+
+    dominators = not_worse & better
+
+    rank = np.full(n, -1, dtype=np.int32)
+    remaining = np.packbits(np.ones(n, dtype=bool))
+    unranked = np.ones(n, dtype=bool)
+    k = 0
+    while unranked.any():
+        front = unranked & ~np.any(dominators & remaining, axis=1)
+        rank[front] = k
+        unranked &= ~front
+        remaining &= ~np.packbits(front)
+        k += 1
+
+    return rank
@@ -12,6 +12,7 @@ import jax.tree_util as jtu
 __all__ = [
     "disable_gpu_preallocation",
     "enable_deterministic_mode",
+    "enable_compilation_cache",
     "tree_zeros_like",
     "tree_ones_like",
     "tree_concat",
@@ -20,6 +21,8 @@ __all__ = [
     "tree_last",
     "tree_get",
     "tree_set",
+    "tree_pack",
+    "tree_unpack",
     "scan_and_mean",
     "scan_and_last",
     "jit_method",
@@ -27,6 +30,7 @@ __all__ = [
     "rng_split",
     "rng_split_by_shape",
     "rng_split_like_tree",
+    "rng_fold_in_like_tree",
     "is_jitted",
     "has_nan",
     "tree_has_nan",
@@ -82,6 +86,25 @@ def enable_deterministic_mode():
     os.environ["XLA_FLAGS"] = xla_flags + "--xla_gpu_deterministic_ops=true"
 
 
+def enable_compilation_cache(cache_dir: str | None = None):
+    """Enable JAX's persistent compilation cache.
+
+    Compiled XLA programs are saved to disk, so repeated runs with the same
+    programs (eg: hyperparameter sweeps) can skip the compilation. It is safe to
+    call this function multiple times.
+
+    Args:
+        cache_dir: The cache directory. Defaults to the environment variable
+            `JAX_CACHE_DIR` or `/tmp/jax_cache`.
+    """
+    if cache_dir is None:
+        cache_dir = os.environ.get("JAX_CACHE_DIR", "/tmp/jax_cache")
+
+    jax.config.update("jax_compilation_cache_dir", cache_dir)
+    jax.config.update("jax_persistent_cache_min_entry_size_bytes", 0)
+    jax.config.update("jax_persistent_cache_min_compile_time_secs", 0)
+
+
 # use chex.set_n_cpu_devices(n) instead
 # def set_host_device_count(n):
 #     """
@@ -111,12 +134,12 @@ def enable_deterministic_mode():
 
 def tree_zeros_like(nest: chex.ArrayTree, dtype=None) -> chex.ArrayTree:
     """Pytree version of `jnp.zeros_like`."""
-    return jtu.tree_map(lambda x: jnp.zeros(x.shape, dtype or x.dtype), nest)
+    return jtu.tree_map(lambda x: jnp.zeros_like(x, dtype=dtype), nest)
 
 
 def tree_ones_like(nest: chex.ArrayTree, dtype=None) -> chex.ArrayTree:
     """Pytree version of `jnp.ones_like`."""
-    return jtu.tree_map(lambda x: jnp.ones(x.shape, dtype or x.dtype), nest)
+    return jtu.tree_map(lambda x: jnp.ones_like(x, dtype=dtype), nest)
 
 
 def tree_concat(nest1: chex.ArrayTree, nest2: chex.ArrayTree, axis: int = 0):
@@ -179,6 +202,63 @@ def tree_set(
     )
 
 
+def tree_pack(
+    tree: chex.ArrayTree, batch_ndim: int = 1
+) -> tuple[tuple[jax.Array, ...], tuple]:
+    """Pack the leaves of a pytree into one contiguous buffer per dtype.
+
+    Leaves with the same dtype are flattened to `[*batch_shape, -1]` and
+    concatenated along the last axis.
+
+    Args:
+        tree: The pytree with leaves of the same leading `batch_ndim` dimensions.
+        batch_ndim: Number of leading batch dimensions kept in the buffers.
+
+    Returns:
+        Tuple:
+        - The packed buffers, one per dtype.
+        - The static layout used by `tree_unpack()` to restore the pytree.
+    """
+    leaves, treedef = jtu.tree_flatten(tree)
+    groups: dict[jnp.dtype, list[int]] = {}
+    for i, leaf in enumerate(leaves):
+        groups.setdefault(jnp.dtype(leaf.dtype), []).append(i)
+
+    packed = []
+    layout = []
+    for group in groups.values():
+        batch_shape = leaves[group[0]].shape[:batch_ndim]
+        packed.append(
+            jnp.concatenate(
+                [jnp.reshape(leaves[i], batch_shape + (-1,)) for i in group], axis=-1
+            )
+        )
+        layout.append(tuple((i, tuple(leaves[i].shape[batch_ndim:])) for i in group))
+
+    return tuple(packed), (treedef, tuple(layout))
+
+
+def tree_unpack(packed: Sequence[jax.Array], layout: tuple) -> chex.ArrayTree:
+    """Restore the pytree packed by `tree_pack()`.
+
+    The packed buffers can have different batch dimensions from the packed ones,
+    eg: after a gather along the batch axes.
+    """
+    treedef, groups = layout
+    leaves = [None] * treedef.num_leaves
+    for buf, group in zip(packed, groups):
+        batch_shape = buf.shape[:-1]
+        offset = 0
+        for i, shape in group:
+            size = math.prod(shape)
+            leaves[i] = jax.lax.slice_in_dim(
+                buf, offset, offset + size, axis=-1
+            ).reshape(batch_shape + shape)
+            offset += size
+
+    return jtu.tree_unflatten(treedef, leaves)
+
+
 def scan_and_mean(*args, **kwargs):
     """Scan with mean aggregation.
 
@@ -188,13 +268,36 @@ def scan_and_mean(*args, **kwargs):
     return last_carry, jtu.tree_map(lambda x: x.mean(axis=0), ys)
 
 
-def scan_and_last(*args, **kwargs):
+def scan_and_last(f, init, xs=None, length=None, reverse=False, **kwargs):
     """Scan and return last iteration results.
 
     Usage: same like `jax.lax.scan`, but return the last scan iteration results.
+    Only the latest results are kept in the carry, so the stacked results of all
+    iterations are never allocated.
     """
-    last_carry, ys = jax.lax.scan(*args, **kwargs)
-    return last_carry, jtu.tree_map(lambda x: x[-1] if x.shape[0] > 0 else x, ys)
+    if length is None:
+        length = jtu.tree_leaves(xs)[0].shape[0]
+
+    if length == 0 or reverse:
+        last_carry, ys = jax.lax.scan(
+            f, init, xs, length=length, reverse=reverse, **kwargs
+        )
+        return last_carry, jtu.tree_map(lambda x: x[-1] if x.shape[0] > 0 else x, ys)
+
+    _, y_shape = jax.eval_shape(f, init, jtu.tree_map(lambda x: x[0], xs))
+    init_y = jtu.tree_map(lambda s: jnp.zeros(s.shape, s.dtype), y_shape)
+
+    def _f(carry, x):
+        carry, _ = carry
+        carry, y = f(carry, x)
+        # strip the weak_type of the results, so they match the initial zeros
+        y = jtu.tree_map(lambda v: jnp.asarray(v, dtype=jnp.result_type(v)), y)
+        return (carry, y), None
+
+    (last_carry, last_y), _ = jax.lax.scan(
+        _f, (init, init_y), xs, length=length, **kwargs
+    )
+    return last_carry, last_y
 
 
 def jit_method(
@@ -253,12 +356,13 @@ def _vmap_rng_split(key: chex.PRNGKey, num: int = 2) -> chex.PRNGKey:
     """
     chex.assert_shape(key, (..., 2))
 
-    rng_split_fn = jax.random.split
-
-    for _ in range(key.ndim - 1):
-        rng_split_fn = jax.vmap(rng_split_fn, in_axes=(0, None), out_axes=1)
+    batch_shape = key.shape[:-1]
+    # flatten the batch dims and vmap once, with num closed over as a static value
+    keys = jax.vmap(lambda k: jax.random.split(k, num), out_axes=1)(
+        key.reshape(-1, 2)
+    )
 
-    return rng_split_fn(key, num)
+    return keys.reshape((num, *batch_shape, 2))
 
 
 def rng_split(key: chex.PRNGKey, num: int = 2) -> chex.PRNGKey:
@@ -284,6 +388,19 @@ def rng_split_like_tree(key: chex.PRNGKey, target: chex.ArrayTree) -> chex.Array
     return jax.tree_unflatten(treedef, keys)
 
 
+def rng_fold_in_like_tree(
+    key: chex.PRNGKey, target: chex.ArrayTree
+) -> chex.ArrayTree:
+    """Derive a key for each leaf of the target pytree by `jax.random.fold_in`.
+
+    Unlike `rng_split_like_tree`, the leaf keys are folded in by the leaf index,
+    without materializing and slicing a stacked array of split keys.
+    """
+    treedef = jtu.tree_structure(target)
+    keys = [jax.random.fold_in(key, i) for i in range(treedef.num_leaves)]
+    return jtu.tree_unflatten(treedef, keys)
+
+
 def is_jitted(func: Callable):
     """Detect if a function is wrapped by jit or pmap."""
     return hasattr(func, "lower")
@@ -324,13 +441,14 @@ def right_shift_with_padding(
     x: chex.Array, shift: int, fill_value: None | chex.Scalar = None
 ):
     """Shift the array to the right with padding."""
-    shifted_matrix = jnp.roll(x, shift=shift, axis=0)
-
-    if fill_value is not None:
-        padding = jnp.full_like(shifted_matrix[:shift], fill_value)
-    else:
-        padding = jnp.zeros_like(shifted_matrix[:shift])
-
-    shifted_matrix = shifted_matrix.at[:shift].set(padding)
+    shift = min(shift, x.shape[0])
+    if shift <= 0:
+        return x
 
-    return shifted_matrix
+    # a single pad op instead of roll + scatter, which XLA can fuse into consumers.
+    pad_width = [(shift, 0)] + [(0, 0)] * (x.ndim - 1)
+    return jnp.pad(
+        x[: x.shape[0] - shift],
+        pad_width,
+        constant_values=0 if fill_value is None else fill_value,
+    )
@@ -124,6 +124,7 @@ def setup_checkpoint_manager(config: DictConfig) -> ocp.CheckpointManager:
         ckpt_options = ocp.CheckpointManagerOptions(
             save_interval_steps=config.checkpoint.save_interval_steps,
             max_to_keep=config.checkpoint.max_to_keep,
+            enable_async_checkpointing=config.checkpoint.async_save,
         )
         ckpt_path = output_dir / "checkpoints"
         logger.info(f"set checkpoint path: {ckpt_path}")
@@ -81,6 +81,9 @@ def compute_gae(
     dones: jax.Array,  # [T, B]
     gae_lambda: float = 1.0,
     discount: float = 0.99,
+    parallel_scan_threshold: int = 256,
+    compute_dtype: jnp.dtype | str | None = None,
+    scan_unroll: int | None = None,
 ) -> tuple[jax.Array, jax.Array]:
     """Calculates the Generalized Advantage Estimation (GAE).
 
@@ -92,6 +95,15 @@ def compute_gae(
         dones: A float32 tensor of shape [T, B] with truncation signal.
         gae_lambda: Mix between 1-step (gae_lambda=0) and n-step (gae_lambda=1).
         discount: TD discount.
+        parallel_scan_threshold: When T >= this value, compute the recurrence by
+          `jax.lax.associative_scan` with O(log T) depth instead of a sequential
+          `jax.lax.scan`. Decided at trace time.
+        compute_dtype: The storage dtype of the deltas, factors and advantages in
+          both scan paths, eg: bfloat16 to halve the memory traffic. The
+          arithmetic is done in float32, and the returns are computed in the
+          dtype of values. None means no casting.
+        scan_unroll: The unroll factor of the sequential scan. None means 16 for
+          T < 256, and 1 otherwise to avoid bloating the compiled program.
 
     Returns:
         Tuple:
@@ -104,21 +116,72 @@ def compute_gae(
 
     deltas = rewards + discount * (1 - dones) * values[1:] - values[:-1]
 
-    bootstrap_gae = jnp.zeros_like(values[0])
-
-    def _compute_gae(gae_t_plus_1, x_t):
-        delta_t, factor_t = x_t
-        gae_t = delta_t + factor_t * gae_t_plus_1
-
-        return gae_t, gae_t
-
-    _, advantages = jax.lax.scan(
-        _compute_gae,
-        bootstrap_gae,
-        (deltas, discount * gae_lambda * (1 - dones)),
-        reverse=True,
-        unroll=16,
-    )
+    factors = discount * gae_lambda * (1 - dones)
+
+    if scan_unroll is None:
+        scan_unroll = 16 if rewards_shape[0] < 256 else 1
+
+    if rewards_shape[0] >= parallel_scan_threshold:
+        # gae_t = delta_t + factor_t * gae_{t+1} is a first-order linear recurrence.
+        # Represent each step as the affine map x -> a*x + b, and compose the maps
+        # by a parallel prefix scan from the end of the trajectory.
+        def _compose(earlier, later):
+            # `earlier` is the composed map of the later timesteps.
+            a1, b1 = earlier
+            a2, b2 = later
+            if compute_dtype is not None:
+                # store in compute_dtype, compute in float32
+                a1, b1, a2, b2 = (x.astype(jnp.float32) for x in (a1, b1, a2, b2))
+                return (
+                    (a1 * a2).astype(compute_dtype),
+                    (a2 * b1 + b2).astype(compute_dtype),
+                )
+            return a1 * a2, a2 * b1 + b2
+
+        if compute_dtype is not None:
+            factors = factors.astype(compute_dtype)
+            deltas = deltas.astype(compute_dtype)
+
+        _, advantages = jax.lax.associative_scan(
+            _compose, (factors, deltas), reverse=True, axis=0
+        )
+        advantages = advantages.astype(values.dtype)
+    elif compute_dtype is not None:
+        # stream the inputs and outputs in compute_dtype, accumulate in float32
+        bootstrap_gae = jnp.zeros_like(values[0], dtype=jnp.float32)
+
+        def _compute_gae(gae_t_plus_1, x_t):
+            delta_t, factor_t = x_t
+            gae_t = delta_t.astype(jnp.float32) + (
+                factor_t.astype(jnp.float32) * gae_t_plus_1
+            )
+
+            return gae_t, gae_t.astype(compute_dtype)
+
+        _, advantages = jax.lax.scan(
+            _compute_gae,
+            bootstrap_gae,
+            (deltas.astype(compute_dtype), factors.astype(compute_dtype)),
+            reverse=True,
+            unroll=scan_unroll,
+        )
+        advantages = advantages.astype(values.dtype)
+    else:
+        bootstrap_gae = jnp.zeros_like(values[0])
+
+        def _compute_gae(gae_t_plus_1, x_t):
+            delta_t, factor_t = x_t
+            gae_t = delta_t + factor_t * gae_t_plus_1
+
+            return gae_t, gae_t
+
+        _, advantages = jax.lax.scan(
+            _compute_gae,
+            bootstrap_gae,
+            (deltas, factors),
+            reverse=True,
+            unroll=scan_unroll,
+        )
 
     lambda_retruns = advantages + values[:-1]
 
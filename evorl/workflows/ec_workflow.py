@@ -20,7 +20,12 @@ from evorl.envs import Env
 from evorl.sample_batch import SampleBatch
 from evorl.evaluators import Evaluator, EpisodeCollector
 from evorl.agent import Agent, AgentState, AgentStateAxis
-from evorl.distributed import get_global_ranks, psum, split_key_to_devices
+from evorl.distributed import (
+    get_global_ranks,
+    local_devices,
+    psum,
+    split_key_to_devices,
+)
 from evorl.types import State, PyTreeData, pytree_field, Params, PyTreeDict
 from evorl.utils.rl_toolkits import flatten_pop_rollout_episode
 from evorl.utils.jax_utils import tree_stop_gradient
@@ -50,7 +55,7 @@ class ECWorkflow(Workflow):
         super().__init__(config)
 
         self.pmap_axis_name = None
-        self.devices = jax.local_devices()[:1]
+        self.devices = list(local_devices()[:1])
 
     @property
     def enable_multi_devices(self) -> bool:
@@ -73,7 +78,7 @@ class ECWorkflow(Workflow):
         """
         config = copy.deepcopy(config)  # avoid in-place modification
 
-        devices = jax.local_devices()
+        devices = list(local_devices())
 
         if enable_multi_devices:
             cls.enable_pmap(POP_AXIS_NAME)
@@ -119,6 +124,9 @@ class ECWorkflow(Workflow):
         """Define which methods should be jitted.
 
         By default, the workflow's `step()` method is jitted.
+
+        Note: `self` is a static argument hashed by its identity, so each workflow
+        instance is traced and compiled once, and later calls hit the jit cache.
         """
         cls.step = jax.jit(cls.step, static_argnums=(0,))
 
@@ -313,13 +321,17 @@ class ECWorkflowTemplate(ECWorkflow):
 
         ec_metrics, ec_opt_state = self.ec_optimizer.tell(ec_opt_state, fitnesses)
 
-        sampled_episodes = psum(
-            jnp.uint32(pop_size * self.config.episodes_for_fitness),
+        # reduce both counters across devices with a single collective
+        sampled_episodes, sampled_timesteps = psum(
+            jnp.stack(
+                [
+                    jnp.uint32(pop_size * self.config.episodes_for_fitness),
+                    rollout_metrics.episode_lengths.sum().astype(jnp.uint32),
+                ]
+            ),
             self.pmap_axis_name,
         )
-        sampled_timesteps_m = (
-            psum(rollout_metrics.episode_lengths.sum(), self.pmap_axis_name) / 1e6
-        )
+        sampled_timesteps_m = sampled_timesteps / 1e6
 
         workflow_metrics = state.metrics.replace(
             sampled_episodes=state.metrics.sampled_episodes + sampled_episodes,
@@ -342,10 +354,37 @@ class ECWorkflowTemplate(ECWorkflow):
             metrics=workflow_metrics,
         )
 
+    def _multi_steps(
+        self, state: State, num_steps: int
+    ) -> tuple[MetricBase, MetricBase, State]:
+        """Run multiple iterations inside a single `jax.lax.scan`.
+
+        Only available in the single-device mode.
+
+        Args:
+            state: State of the workflow.
+            num_steps: Number of iterations to run. Should be static under jit.
+
+        Returns:
+            Tuple of (train_metrics, workflow_metrics, state), where the metrics
+            are stacked along the first axis with length `num_steps`.
+        """
+
+        def _one_step(state, _):
+            train_metrics, state = self.step(state)
+            return state, (train_metrics, state.metrics)
+
+        state, (train_metrics, workflow_metrics) = jax.lax.scan(
+            _one_step, state, (), length=num_steps
+        )
+
+        return train_metrics, workflow_metrics, state
+
     @classmethod
     def enable_jit(cls) -> None:
         super().enable_jit()
         cls._postsetup = jax.jit(cls._postsetup, static_argnums=(0,))
+        cls._multi_steps = jax.jit(cls._multi_steps, static_argnums=(0, 2))
 
     @classmethod
     def enable_pmap(cls, axis_name) -> None:
@@ -418,13 +457,17 @@ class MultiObjectiveECWorkflowTemplate(ECWorkflowTemplate):
 
         ec_metrics, ec_opt_state = self.ec_optimizer.tell(ec_opt_state, fitnesses)
 
-        sampled_episodes = psum(
-            jnp.uint32(pop_size * self.config.episodes_for_fitness),
+        # reduce both counters across devices with a single collective
+        sampled_episodes, sampled_timesteps = psum(
+            jnp.stack(
+                [
+                    jnp.uint32(pop_size * self.config.episodes_for_fitness),
+                    rollout_metrics.episode_lengths.sum().astype(jnp.uint32),
+                ]
+            ),
             self.pmap_axis_name,
         )
-        sampled_timesteps_m = (
-            psum(rollout_metrics.episode_lengths.sum(), self.pmap_axis_name) / 1e6
-        )
+        sampled_timesteps_m = sampled_timesteps / 1e6
 
         workflow_metrics = state.metrics.replace(
             sampled_episodes=state.metrics.sampled_episodes + sampled_episodes,
@@ -9,7 +9,7 @@ from typing_extensions import Self  # pytype: disable=not-supported-yet
 
 from evorl.replay_buffers import AbstractReplayBuffer, ReplayBufferState
 from evorl.agent import Agent, AgentState
-from evorl.distributed import PMAP_AXIS_NAME, split_key_to_devices
+from evorl.distributed import PMAP_AXIS_NAME, local_devices, split_keys_to_devices
 from evorl.envs import Env
 from evorl.evaluators import Evaluator
 from evorl.metrics import EvaluateMetric, MetricBase, WorkflowMetric
@@ -32,7 +32,7 @@ class RLWorkflow(Workflow):
         super().__init__(config)
 
         self.pmap_axis_name = None
-        self.devices = jax.local_devices()[:1]
+        self.devices = list(local_devices()[:1])
 
     @property
     def enable_multi_devices(self) -> bool:
@@ -55,7 +55,7 @@ class RLWorkflow(Workflow):
         """
         config = copy.deepcopy(config)  # avoid in-place modification
 
-        devices = jax.local_devices()
+        devices = list(local_devices())
 
         if enable_multi_devices:
             cls.enable_pmap(PMAP_AXIS_NAME)
@@ -120,6 +120,9 @@ class RLWorkflow(Workflow):
         """Define which methods should be jitted.
 
         By default, the workflow's `step()` and `evaluate()` methods are jitted.
+
+        Note: `self` is a static argument hashed by its identity, so each workflow
+        instance is traced and compiled once, and later calls hit the jit cache.
         """
         cls.evaluate = jax.jit(cls.evaluate, static_argnums=(0,))
         cls.step = jax.jit(cls.step, static_argnums=(0,))
@@ -200,9 +203,7 @@ class OnPolicyWorkflow(RLWorkflow):
             )
 
             # key and env_state should be different over devices
-            key = split_key_to_devices(key, self.devices)
-
-            env_key = split_key_to_devices(env_key, self.devices)
+            key, env_key = split_keys_to_devices((key, env_key), self.devices)
             env_state = jax.pmap(self.env.reset, axis_name=self.pmap_axis_name)(env_key)
         else:
             env_state = self.env.reset(env_key)
@@ -304,14 +305,17 @@ class OffPolicyWorkflow(RLWorkflow):
             )
 
             # key and env_state should be different over devices
-            key = split_key_to_devices(key, self.devices)
+            key, env_key, rb_key = split_keys_to_devices(
+                (key, env_key, rb_key), self.devices
+            )
 
-            env_key = split_key_to_devices(env_key, self.devices)
-            env_state = jax.pmap(self.env.reset, axis_name=self.pmap_axis_name)(env_key)
-            rb_key = split_key_to_devices(rb_key, self.devices)
-            replay_buffer_state = jax.pmap(
-                self._setup_replaybuffer, axis_name=self.pmap_axis_name
-            )(rb_key)
+            # compile the device-local setups into a single pmap
+            def _device_setup(env_key, rb_key):
+                return self.env.reset(env_key), self._setup_replaybuffer(rb_key)
+
+            env_state, replay_buffer_state = jax.pmap(
+                _device_setup, axis_name=self.pmap_axis_name
+            )(env_key, rb_key)
         else:
             env_state = self.env.reset(env_key)
             replay_buffer_state = self._setup_replaybuffer(rb_key)
@@ -1,4 +1,5 @@
-from evorl.utils.ec_utils import ParamVectorSpec
+from evorl.utils.ec_utils import ParamVectorSpec, rank_intersect
+import numpy as np
 import flax.linen as nn
 import jax
 import jax.numpy as jnp
@@ -30,3 +31,34 @@ def test_ParamVectorSpec():
 
     batch_recover = param_spec.to_tree(batch_flat)
     chex.assert_trees_all_close(batch_params, batch_recover)
+
+
+def _brute_force_rank(fitnesses):
+    n = fitnesses.shape[0]
+    rank = np.full(n, -1)
+    remaining = np.ones(n, dtype=bool)
+    k = 0
+    while remaining.any():
+        front = [
+            i
+            for i in np.flatnonzero(remaining)
+            if not any(
+                np.all(fitnesses[j] <= fitnesses[i])
+                and np.any(fitnesses[j] < fitnesses[i])
+                for j in np.flatnonzero(remaining)
+            )
+        ]
+        rank[front] = k
+        remaining[front] = False
+        k += 1
+    return rank
+
+
+def test_rank_intersect():
+    rng = np.random.default_rng(42)
+    for n, m in [(1, 2), (7, 1), (30, 2), (65, 3)]:
+        # small integer values to cover ties and duplicated solutions
+        fitnesses = rng.integers(0, 5, size=(n, m)).astype(np.float32)
+        np.testing.assert_array_equal(
+            rank_intersect(fitnesses), _brute_force_rank(fitnesses)
+        )
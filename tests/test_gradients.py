@@ -0,0 +1,41 @@
+import jax
+import jax.numpy as jnp
+import chex
+import optax
+
+from evorl.agent import AgentState
+from evorl.distributed import agent_gradient_update
+from evorl.distributed.gradients import fused_apply_updates
+from evorl.types import PyTreeDict
+
+
+def test_fused_apply_updates():
+    params = dict(w=jnp.ones((3, 2)), b=jnp.zeros((2,)))
+    updates = dict(w=jnp.full((3, 2), 0.5), b=jnp.arange(2, dtype=jnp.float32))
+
+    chex.assert_trees_all_close(
+        fused_apply_updates(params, updates), optax.apply_updates(params, updates)
+    )
+
+
+def test_agent_gradient_update():
+    params = PyTreeDict(w=jnp.ones((3,)))
+    agent_state = AgentState(params=params)
+    optimizer = optax.sgd(0.1)
+
+    def loss_fn(agent_state, sample_batch, key):
+        return jnp.sum(agent_state.params.w * sample_batch)
+
+    update_fn = agent_gradient_update(loss_fn, optimizer)
+    opt_state = optimizer.init(params)
+    sample_batch = jnp.array([1.0, 2.0, 3.0])
+
+    loss, new_agent_state, opt_state = jax.jit(update_fn)(
+        opt_state, agent_state, sample_batch, jax.random.PRNGKey(0)
+    )
+
+    assert loss == 6.0
+    # the returned agent_state must carry the updated params
+    chex.assert_trees_all_close(
+        new_agent_state.params.w, params.w - 0.1 * sample_batch
+    )
@@ -0,0 +1,96 @@
+import jax
+import jax.numpy as jnp
+import chex
+
+from evorl.utils.jax_utils import (
+    right_shift_with_padding,
+    rng_fold_in_like_tree,
+    scan_and_last,
+    tree_get,
+    tree_pack,
+    tree_unpack,
+)
+
+
+def test_scan_and_last():
+    def _f(carry, x):
+        carry = carry + x
+        return carry, dict(cumsum=carry, double=2 * x)
+
+    xs = jnp.arange(1, 6, dtype=jnp.float32)
+
+    last_carry, last_y = scan_and_last(_f, jnp.zeros(()), xs)
+    ref_carry, ref_ys = jax.lax.scan(_f, jnp.zeros(()), xs)
+
+    chex.assert_trees_all_close(last_carry, ref_carry)
+    chex.assert_trees_all_close(
+        last_y, jax.tree_util.tree_map(lambda y: y[-1], ref_ys)
+    )
+
+
+def test_scan_and_last_without_xs():
+    def _f(carry, _):
+        return carry + 1, carry * 2
+
+    last_carry, last_y = scan_and_last(_f, jnp.zeros((), jnp.int32), (), length=4)
+
+    assert last_carry == 4
+    assert last_y == 6
+
+
+def test_scan_and_last_weak_typed_results():
+    def _f(carry, x):
+        # the python scalar result is weakly typed
+        return carry + x, 3.0
+
+    xs = jnp.arange(1, 6, dtype=jnp.float32)
+    last_carry, last_y = scan_and_last(_f, jnp.zeros(()), xs)
+
+    assert last_carry == 15
+    assert last_y == 3.0
+
+
+def test_tree_pack():
+    tree = dict(
+        obs=jnp.arange(24, dtype=jnp.float32).reshape(6, 2, 2),
+        rewards=jnp.arange(6, dtype=jnp.float32),
+        actions=jnp.arange(6, dtype=jnp.int32),
+        mask=jnp.arange(6) % 2 == 0,
+    )
+    packed, layout = tree_pack(tree, batch_ndim=1)
+    # one buffer per dtype
+    assert len(packed) == 3
+
+    indices = jnp.array([5, 0, 3])
+    chex.assert_trees_all_equal(
+        tree_unpack(tuple(x[indices] for x in packed), layout),
+        tree_get(tree, indices),
+    )
+
+
+def test_rng_fold_in_like_tree():
+    tree = dict(a=jnp.zeros((3,)), b=(jnp.zeros((2, 2)), jnp.zeros(())))
+    key = jax.random.PRNGKey(42)
+
+    keys = rng_fold_in_like_tree(key, tree)
+    chex.assert_trees_all_equal_structs(keys, tree)
+
+    leaf_keys = jax.tree_util.tree_leaves(keys)
+    for i, k in enumerate(leaf_keys):
+        chex.assert_trees_all_equal(k, jax.random.fold_in(key, i))
+    assert len({tuple(k.tolist()) for k in leaf_keys}) == len(leaf_keys)
+
+
+def test_right_shift_with_padding():
+    x = jnp.arange(12, dtype=jnp.float32).reshape(4, 3)
+
+    chex.assert_trees_all_equal(
+        right_shift_with_padding(x, 1),
+        jnp.concatenate([jnp.zeros((1, 3)), x[:-1]]),
+    )
+    chex.assert_trees_all_equal(
+        right_shift_with_padding(x, 2, fill_value=-1),
+        jnp.concatenate([jnp.full((2, 3), -1.0), x[:-2]]),
+    )
+    chex.assert_trees_all_equal(right_shift_with_padding(x, 0), x)
+    chex.assert_trees_all_equal(right_shift_with_padding(x, 5), jnp.zeros_like(x))
@@ -0,0 +1,46 @@
+import jax
+import jax.numpy as jnp
+import chex
+
+from evorl.sample_batch import SampleBatch
+
+
+def _make_sample_batch(key, B=4):
+    keys = jax.random.split(key, 3)
+    return SampleBatch(
+        obs=jax.random.normal(keys[0], (B, 3)),
+        actions=jax.random.normal(keys[1], (B, 2, 2)),
+        rewards=jax.random.normal(keys[2], (B,)),
+    )
+
+
+def test_select():
+    x = _make_sample_batch(jax.random.PRNGKey(0))
+    y = _make_sample_batch(jax.random.PRNGKey(1))
+    cond = jnp.array([True, False, False, True])
+
+    ref = jax.tree_util.tree_map(lambda a, b: (a.T * cond + b.T * (1 - cond)).T, x, y)
+    chex.assert_trees_all_close(x.select(y, cond), ref)
+
+    assert x.select(y, True) is x
+    assert x.select(y, False) is y
+
+
+def test_select_non_boolean_cond():
+    x = _make_sample_batch(jax.random.PRNGKey(0))
+    y = _make_sample_batch(jax.random.PRNGKey(1))
+    # nonzero values select x, without interpolation
+    cond = jnp.array([0.0, 2.0, 0.5, 1.0])
+    bool_cond = jnp.array([False, True, True, True])
+
+    chex.assert_trees_all_equal(x.select(y, cond), x.select(y, bool_cond))
+    assert x.select(y, 0.5) is x
+    assert x.select(y, 0) is y
+
+
+def test_select_no_nan_leak():
+    x = _make_sample_batch(jax.random.PRNGKey(0))
+    y = jax.tree_util.tree_map(lambda a: jnp.full_like(a, jnp.nan), x)
+    cond = jnp.ones((4,), dtype=jnp.bool_)
+
+    chex.assert_trees_all_equal(x.select(y, cond), x)
@@ -1,4 +1,5 @@
 import jax
+import pytest
 import jax.numpy as jnp
 import chex
 
@@ -21,6 +22,25 @@ def test_gae():
     compute_gae(rewards, values, dones, 0.95, 0.99)
 
 
+def test_gae_associative_scan():
+    T = 300
+    B = 5
+    keys = jax.random.split(jax.random.PRNGKey(42), 3)
+    rewards = jax.random.uniform(keys[0], (T, B), dtype=jnp.float32)
+    values = jax.random.uniform(keys[1], (T + 1, B), dtype=jnp.float32)
+    dones = jax.random.bernoulli(keys[2], 0.05, (T, B)).astype(jnp.float32)
+
+    ref_returns, ref_advantages = compute_gae(
+        rewards, values, dones, 0.95, 0.99, parallel_scan_threshold=T + 1
+    )
+    returns, advantages = compute_gae(
+        rewards, values, dones, 0.95, 0.99, parallel_scan_threshold=T
+    )
+
+    chex.assert_trees_all_close(advantages, ref_advantages, rtol=1e-5, atol=1e-5)
+    chex.assert_trees_all_close(returns, ref_returns, rtol=1e-5, atol=1e-5)
+
+
 def test_discount_return():
     T = 1000
     B = 3
@@ -75,3 +95,21 @@ def test_discount_return_with_dones():
     discount_return = compute_discount_return(rewards, dones, discount)
     discount_return_real = _real_discount_return(rewards, discount, term_steps)
     chex.assert_trees_all_close(discount_return, discount_return_real)
+
+
+@pytest.mark.parametrize("T", [64, 300])
+def test_gae_compute_dtype(T):
+    B = 5
+    keys = jax.random.split(jax.random.PRNGKey(42), 3)
+    rewards = jax.random.uniform(keys[0], (T, B), dtype=jnp.float32)
+    values = jax.random.uniform(keys[1], (T + 1, B), dtype=jnp.float32)
+    dones = jax.random.bernoulli(keys[2], 0.05, (T, B)).astype(jnp.float32)
+
+    ref_returns, ref_advantages = compute_gae(rewards, values, dones, 0.95, 0.99)
+    returns, advantages = compute_gae(
+        rewards, values, dones, 0.95, 0.99, compute_dtype=jnp.bfloat16
+    )
+
+    assert returns.dtype == advantages.dtype == jnp.float32
+    chex.assert_trees_all_close(advantages, ref_advantages, rtol=2e-2, atol=5e-2)
+    chex.assert_trees_all_close(returns, ref_returns, rtol=2e-2, atol=5e-2)